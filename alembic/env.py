@@ -0,0 +1,43 @@
+# alembic/env.py
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app import models  # noqa: F401  (registra las tablas en Base.metadata)
+from app.database import Base, DATABASE_URL
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# `alembic -x url=sqlite:///otra.db upgrade head` permite apuntar a otra base
+URL = context.get_x_argument(as_dictionary=True).get("url") or DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """Genera el SQL sin conectarse (alembic upgrade head --sql)."""
+    context.configure(
+        url=URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    conectable = create_engine(URL, poolclass=pool.NullPool)
+    with conectable.connect() as conexion:
+        context.configure(connection=conexion, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,61 @@
+"""Esquema inicial (el que creaba Base.metadata.create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'Usuarios',
+        sa.Column('idUsuario', sa.Integer(), primary_key=True),
+        sa.Column('nombreUsuario', sa.String(100), nullable=False),
+        sa.Column('apellidoUsuario', sa.String(100), nullable=False),
+        sa.Column('correoUsuario', sa.String(150), nullable=False, unique=True),
+        sa.Column('sexoUsuario', sa.String(50)),
+        sa.Column('generoFavUsuario', sa.String(255)),
+    )
+    op.create_index('ix_Usuarios_idUsuario', 'Usuarios', ['idUsuario'])
+
+    op.create_table(
+        'Peliculas',
+        sa.Column('idPelicula', sa.Integer(), primary_key=True),
+        sa.Column('tituloPelicula', sa.String(255), nullable=False, unique=True),
+        sa.Column('directorPelicula', sa.String(100)),
+        sa.Column('añoPelicula', sa.Integer()),
+        sa.Column('generos', sa.String(100)),
+        sa.Column('poster_url', sa.String(255)),
+    )
+    op.create_index('ix_Peliculas_idPelicula', 'Peliculas', ['idPelicula'])
+
+    op.create_table(
+        'Reviews',
+        sa.Column('idReview', sa.Integer(), primary_key=True),
+        sa.Column('numPersonaReview', sa.Integer(), sa.ForeignKey('Usuarios.idUsuario')),
+        sa.Column('numPeliculareview', sa.Integer(), sa.ForeignKey('Peliculas.idPelicula')),
+        sa.Column('textReview', sa.String(1000)),
+        sa.Column('resultado_review', sa.String(20)),
+        sa.Column('porcentaje_review', sa.Integer()),
+    )
+    op.create_index('ix_Reviews_idReview', 'Reviews', ['idReview'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('Reviews')
+    op.drop_table('Peliculas')
+    op.drop_table('Usuarios')
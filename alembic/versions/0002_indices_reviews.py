@@ -0,0 +1,37 @@
+"""Índices compuestos de Reviews por película y por usuario
+
+Las consultas por película (listado paginado por idReview, promedio de
+porcentaje_review) y por usuario filtran por la clave foránea. Con estos
+índices no recorren la tabla: el promedio sale sólo del índice
+(numPeliculareview, porcentaje_review) y los listados leen el rango ya
+ordenado por idReview.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reviews_pelicula_porcentaje', 'Reviews', ['numPeliculareview', 'porcentaje_review'])
+    op.create_index('ix_reviews_pelicula_review', 'Reviews', ['numPeliculareview', 'idReview'])
+    op.create_index('ix_reviews_usuario_review', 'Reviews', ['numPersonaReview', 'idReview'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reviews_usuario_review', table_name='Reviews')
+    op.drop_index('ix_reviews_pelicula_review', table_name='Reviews')
+    op.drop_index('ix_reviews_pelicula_porcentaje', table_name='Reviews')
@@ -0,0 +1,70 @@
+"""Tabla EstadisticasPeliculas con los agregados de reviews por película
+
+create_review la actualiza en la misma transacción; la valoración de una
+película deja de ser un AVG() sobre todas sus reviews. La migración la llena
+con los datos existentes (mismo cálculo que `python -m app.estadisticas`).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    estadisticas = op.create_table(
+        'EstadisticasPeliculas',
+        sa.Column('idPelicula', sa.Integer(), sa.ForeignKey('Peliculas.idPelicula'), primary_key=True),
+        sa.Column('totalReviews', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sumaPorcentaje', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('reviewsConPorcentaje', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reviewsPositivas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reviewsNegativas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reviewsNeutras', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    peliculas = sa.table('Peliculas', sa.column('idPelicula'))
+    reviews = sa.table(
+        'Reviews',
+        sa.column('idReview'), sa.column('numPeliculareview'),
+        sa.column('resultado_review'), sa.column('porcentaje_review'),
+    )
+
+    def contar(resultado):
+        return sa.func.count(sa.case((reviews.c.resultado_review == resultado, 1)))
+
+    agregados = (
+        sa.select(
+            peliculas.c.idPelicula,
+            sa.func.count(reviews.c.idReview),
+            sa.func.coalesce(sa.func.sum(reviews.c.porcentaje_review), 0),
+            sa.func.count(reviews.c.porcentaje_review),
+            contar('POSITIVO'),
+            contar('NEGATIVO'),
+            contar('NEUTRO'),
+        )
+        .select_from(peliculas.outerjoin(reviews, reviews.c.numPeliculareview == peliculas.c.idPelicula))
+        .group_by(peliculas.c.idPelicula)
+    )
+    op.execute(estadisticas.insert().from_select(
+        ['idPelicula', 'totalReviews', 'sumaPorcentaje', 'reviewsConPorcentaje',
+         'reviewsPositivas', 'reviewsNegativas', 'reviewsNeutras'],
+        agregados,
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('EstadisticasPeliculas')
@@ -0,0 +1,34 @@
+"""Columna Reviews.estado_review para la ingesta asíncrona
+
+Las reseñas de /crear-resena/ con RESENA_ASINCRONA quedan PENDIENTE hasta que
+un trabajador las analiza. Las existentes ya están analizadas (LISTA).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Reviews', sa.Column('estado_review', sa.String(20), nullable=False, server_default='LISTA'))
+    op.create_index('ix_reviews_estado', 'Reviews', ['estado_review'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reviews_estado', table_name='Reviews')
+    with op.batch_alter_table('Reviews') as batch_op:
+        batch_op.drop_column('estado_review')
@@ -0,0 +1,34 @@
+"""Columna Reviews.modelo_version
+
+Versión del modelo que analizó cada review (nombre del archivo + mtime/tamaño,
+como ai_service.obtener_version_modelo). `python -m app.reevaluacion` vuelve a
+analizar las que no coinciden con el modelo actual. Las existentes quedan en
+NULL: se desconoce con qué modelo se analizaron.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Reviews', sa.Column('modelo_version', sa.String(100)))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('Reviews') as batch_op:
+        batch_op.drop_column('modelo_version')
@@ -0,0 +1,91 @@
+"""Reviews.porcentaje_review y EstadisticasPeliculas.sumaPorcentaje pasan a Double
+
+porcentaje_review era Integer: MySQL guardaba la probabilidad (0-1) redondeada
+a 0 o 1, mientras que EstadisticasPeliculas sumaba el valor sin redondear.
+sumaPorcentaje era Float (FLOAT de 4 bytes en MySQL): con muchas reviews la
+suma perdía precisión. Las reviews ya
+guardadas conservan su valor redondeado; la tabla de estadísticas se recalcula
+desde lo guardado (mismo cálculo que `python -m app.estadisticas`) para que
+coincida con una reconstrucción. `python -m app.reevaluacion --reiniciar`
+recupera los decimales de las reviews viejas.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _reconstruir_estadisticas() -> None:
+    estadisticas = sa.table(
+        'EstadisticasPeliculas',
+        sa.column('idPelicula'), sa.column('totalReviews'), sa.column('sumaPorcentaje'),
+        sa.column('reviewsConPorcentaje'), sa.column('reviewsPositivas'), sa.column('reviewsNegativas'), sa.column('reviewsNeutras'),
+    )
+    peliculas = sa.table('Peliculas', sa.column('idPelicula'))
+    reviews = sa.table(
+        'Reviews',
+        sa.column('idReview'), sa.column('numPeliculareview'), sa.column('estado_review'),
+        sa.column('resultado_review'), sa.column('porcentaje_review'),
+    )
+
+    def contar(resultado):
+        return sa.func.count(sa.case((reviews.c.resultado_review == resultado, 1)))
+
+    agregados = (
+        sa.select(
+            peliculas.c.idPelicula,
+            sa.func.count(reviews.c.idReview),
+            sa.func.coalesce(sa.func.sum(reviews.c.porcentaje_review), 0),
+            sa.func.count(reviews.c.porcentaje_review),
+            contar('POSITIVO'),
+            contar('NEGATIVO'),
+            contar('NEUTRO'),
+        )
+        .select_from(peliculas.outerjoin(
+            reviews,
+            (reviews.c.numPeliculareview == peliculas.c.idPelicula) & (reviews.c.estado_review == 'LISTA'),
+        ))
+        .group_by(peliculas.c.idPelicula)
+    )
+    op.execute(estadisticas.delete())
+    op.execute(estadisticas.insert().from_select(
+        ['idPelicula', 'totalReviews', 'sumaPorcentaje', 'reviewsConPorcentaje',
+         'reviewsPositivas', 'reviewsNegativas', 'reviewsNeutras'],
+        agregados,
+    ))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('Reviews') as batch_op:
+        batch_op.alter_column('porcentaje_review', type_=sa.Double(), existing_type=sa.Integer())
+    with op.batch_alter_table('EstadisticasPeliculas') as batch_op:
+        batch_op.alter_column(
+            'sumaPorcentaje', type_=sa.Double(), existing_type=sa.Float(),
+            existing_nullable=False, existing_server_default='0'
+        )
+    _reconstruir_estadisticas()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('EstadisticasPeliculas') as batch_op:
+        batch_op.alter_column(
+            'sumaPorcentaje', type_=sa.Float(), existing_type=sa.Double(),
+            existing_nullable=False, existing_server_default='0'
+        )
+    with op.batch_alter_table('Reviews') as batch_op:
+        batch_op.alter_column('porcentaje_review', type_=sa.Integer(), existing_type=sa.Double())
+    _reconstruir_estadisticas()
@@ -1,33 +1,255 @@
 #!/usr/bin/env python3
+import hashlib
 import joblib
+import json
 import re
 import nltk
 import os
+import numpy as np
 from nltk.corpus import stopwords
+from app import config
+from app.cache import CacheLRU
+from app.preprocesamiento import PREPROCESADORES, preprocesar
+
+# Máximo de reseñas aceptadas por llamada a analizar_sentimientos_lote
+MAX_TEXTOS_LOTE = 1000
+
+EMOJIS = {"POSITIVO": "😊", "NEGATIVO": "😠", "NEUTRO": "😐"}
+
+# Resultados ya calculados, por (versión del modelo, hash del texto preprocesado).
+# Las reseñas repetidas ("Great movie!", reenvíos del formulario) no vuelven a
+# pasar por el vectorizador ni por el modelo. Es por proceso: con el backend
+# "procesos" cada worker tiene la suya.
+cache_sentimientos = CacheLRU(config.CACHE_SENTIMIENTO_TAMANO, config.CACHE_SENTIMIENTO_TTL_S)
+
+class ModeloCompacto:
+    """
+    Scorer en NumPy puro sobre el formato exportado por
+    `exportar_modelo_compacto` (machine-learning/entrenamiento.py).
+
+    Los arrays se abren con mmap: varios workers comparten las mismas páginas
+    del archivo en vez de tener cada uno su copia del vocabulario.
+    Reproduce TfidfVectorizer (analyzer='word') + LogisticRegression binaria
+    y expone `predict_proba` igual que el Pipeline de sklearn.
+    """
+
+    def __init__(self, directorio):
+        with open(os.path.join(directorio, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        # Vocabulario ordenado (bytes UTF-8) + pesos alineados por posición
+        self.terminos = np.load(os.path.join(directorio, 'terminos.npy'), mmap_mode='r')
+        self.idf = np.load(os.path.join(directorio, 'idf.npy'), mmap_mode='r')
+        self.coef = np.load(os.path.join(directorio, 'coef.npy'), mmap_mode='r')
+
+        self.idioma = meta.get('idioma', 'en')
+        self.intercepto = float(meta['intercepto'])
+        self.clases = meta['clases']
+        self.ngram_range = tuple(meta['ngram_range'])
+        self.lowercase = meta['lowercase']
+        self.norm = meta['norm']
+        self.sublinear_tf = meta['sublinear_tf']
+        self._token = re.compile(meta['token_pattern'])
+
+    def _ngramas(self, texto):
+        if self.lowercase:
+            texto = texto.lower()
+        tokens = self._token.findall(texto)
+
+        min_n, max_n = self.ngram_range
+        ngramas = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            ngramas.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return ngramas
+
+    def decision_function(self, textos):
+        n_textos = len(textos)
+        z = np.full(n_textos, self.intercepto)
+
+        filas, terminos = [], []
+        for fila, texto in enumerate(textos):
+            ngramas = self._ngramas(texto)
+            terminos.extend(ngramas)
+            filas.extend([fila] * len(ngramas))
+        if not terminos:
+            return z
+
+        # Búsqueda binaria de todos los n-gramas del lote contra el vocabulario
+        consulta = np.array([t.encode('utf-8') for t in terminos])
+        n_vocab = len(self.terminos)
+        posiciones = np.minimum(np.searchsorted(self.terminos, consulta), n_vocab - 1)
+        encontrados = self.terminos[posiciones] == consulta
+        if not encontrados.any():
+            return z
+
+        # Frecuencia de cada (fila, término)
+        claves = np.asarray(filas, dtype=np.int64)[encontrados] * n_vocab + posiciones[encontrados]
+        claves, tf = np.unique(claves, return_counts=True)
+        filas = claves // n_vocab
+        indices = claves % n_vocab
+
+        tf = tf.astype(np.float64)
+        if self.sublinear_tf:
+            tf = 1.0 + np.log(tf)
+        valores = tf * self.idf[indices]
+
+        if self.norm == 'l2':
+            normas = np.sqrt(np.bincount(filas, valores * valores, minlength=n_textos))
+            valores = valores / normas[filas]
+        elif self.norm == 'l1':
+            normas = np.bincount(filas, np.abs(valores), minlength=n_textos)
+            valores = valores / normas[filas]
+
+        return z + np.bincount(filas, valores * self.coef[indices], minlength=n_textos)
+
+    def predict_proba(self, textos):
+        prob_positiva = 1.0 / (1.0 + np.exp(-self.decision_function(textos)))
+        return np.column_stack([1.0 - prob_positiva, prob_positiva])
 
 # Encontrar y cargar el modelo
-def cargar_modelo():
+def encontrar_ruta_modelo(formato="pipeline", idioma="en"):
+    """
+    `formato`: "pipeline" (.pkl de sklearn) o "compacto" (directorio mapeable).
+    `idioma`: "en" (modelo original) o "es" (modelo nativo en español, sufijo _es).
+    """
+    sufijo = '' if idioma == "en" else f'_{idioma}'
+    nombre = f'sentimiento_compacto{sufijo}' if formato == "compacto" else f'sentimiento_pipeline{sufijo}.pkl'
     posibles_rutas = [
-        'machine-learning/sentimiento_pipeline.pkl',
-        'sentimiento_pipeline.pkl', 
-        '../machine-learning/sentimiento_pipeline.pkl'
+        f'machine-learning/{nombre}',
+        nombre, 
+        f'../machine-learning/{nombre}'
     ]
     
     for ruta in posibles_rutas:
         if os.path.exists(ruta):
-            modelo = joblib.load(ruta)
-            print(f"✅ Modelo cargado desde: {ruta}")
-            return modelo
+            return os.path.abspath(ruta)
     
-    raise FileNotFoundError("No se encontró el archivo del modelo")
+    raise FileNotFoundError(f"No se encontró el archivo del modelo ({nombre})")
+
+def cargar_modelo(ruta=None, idioma=None):
+    """
+    Carga un modelo y le asigna su idioma (`modelo.idioma`), que decide el
+    preprocesado con el que se analiza. Por defecto sale de meta.json (compacto)
+    o del sufijo del nombre ("sentimiento_pipeline_es.pkl" -> "es").
+    """
+    ruta = ruta or encontrar_ruta_modelo()
+    if os.path.isdir(ruta):
+        modelo = ModeloCompacto(ruta)
+    else:
+        modelo = joblib.load(ruta)
+    if idioma is None:
+        sufijo = os.path.splitext(os.path.basename(ruta.rstrip(os.sep)))[0].rsplit('_', 1)[-1]
+        idioma = getattr(modelo, 'idioma', None) or (sufijo if sufijo in PREPROCESADORES else 'en')
+    modelo.idioma = idioma
+
+    # Identifica el archivo cargado: un modelo reentrenado no reutiliza la caché del anterior
+    modelo.version_modelo = version_archivo(ruta)
+    print(f"✅ Modelo cargado desde: {ruta}")
+    return modelo
+
+ARCHIVOS_COMPACTO = ('meta.json', 'terminos.npy', 'idf.npy', 'coef.npy')
+
+def hash_modelo_compacto(directorio):
+    """Hash del contenido de los archivos del formato compacto (sin el campo 'version' de meta.json)."""
+    digest = hashlib.blake2b(digest_size=8)
+    for nombre in ARCHIVOS_COMPACTO:
+        ruta = os.path.join(directorio, nombre)
+        if nombre == 'meta.json':
+            with open(ruta, encoding='utf-8') as f:
+                meta = json.load(f)
+            meta.pop('version', None)
+            digest.update(json.dumps(meta, sort_keys=True).encode('utf-8'))
+            continue
+        _actualizar_hash(digest, ruta)
+    return digest.hexdigest()
+
+def _actualizar_hash(digest, ruta):
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            digest.update(bloque)
+
+# ruta -> (mtime_ns, tamaño, hash): MODELO_RECARGA_S consulta la versión seguido
+# y el .pkl sólo se vuelve a leer si cambió en disco
+_hashes_pkl = {}
+
+def hash_archivo(ruta):
+    """Hash del contenido de un archivo (el .pkl del Pipeline)."""
+    estado = os.stat(ruta)
+    firma = (estado.st_mtime_ns, estado.st_size)
+    guardado = _hashes_pkl.get(ruta)
+    if guardado and guardado[:2] == firma:
+        return guardado[2]
+    digest = hashlib.blake2b(digest_size=8)
+    _actualizar_hash(digest, ruta)
+    _hashes_pkl[ruta] = (*firma, digest.hexdigest())
+    return digest.hexdigest()
+
+def version_archivo(ruta):
+    """
+    Versión del modelo en `ruta`: nombre + hash del contenido. Se guarda en
+    Reviews.modelo_version, así que no depende de la fecha de modificación (que
+    cambia en cada checkout o deploy). Compacto: el hash que
+    exportar_modelo_compacto anota en meta.json (o se calcula si falta).
+    """
+    if os.path.isdir(ruta):
+        with open(os.path.join(ruta, 'meta.json'), encoding='utf-8') as f:
+            version = json.load(f).get('version') or hash_modelo_compacto(ruta)
+        return f"{os.path.basename(ruta.rstrip(os.sep))}@{version}"
+    return f"{os.path.basename(ruta)}@{hash_archivo(ruta)}"
+
+def versiones_en_disco(formato="pipeline", idiomas=("en", "es")):
+    """{idioma: versión} de los modelos que cargaría cargar_modelos ahora, sin cargarlos."""
+    versiones = {}
+    for idioma in idiomas:
+        try:
+            versiones[idioma] = version_archivo(encontrar_ruta_modelo(formato, idioma))
+        except FileNotFoundError:
+            continue
+    return versiones
+
+def cargar_modelos(formato="pipeline", idiomas=("en", "es")):
+    """
+    Carga un modelo por idioma: {idioma: (ruta, modelo)}. El inglés es
+    obligatorio; los demás se cargan sólo si existen.
+    """
+    modelos = {}
+    for idioma in idiomas:
+        try:
+            ruta = encontrar_ruta_modelo(formato, idioma)
+        except FileNotFoundError:
+            if idioma == "en":
+                raise
+            print(f"ℹ️ Sin modelo para '{idioma}': esas reseñas se traducen al inglés")
+            continue
+        modelos[idioma] = (ruta, cargar_modelo(ruta, idioma))
+    return modelos
+
+def idioma_modelo(modelo):
+    return getattr(modelo, 'idioma', 'en')
+
+def obtener_version_modelo(modelo):
+    return getattr(modelo, 'version_modelo', None) or f"memoria-{id(modelo):x}"
+
+def _clave_cache(version_modelo, texto_procesado):
+    return version_modelo, hashlib.blake2b(texto_procesado.encode('utf-8'), digest_size=16).digest()
+
+# 🔥 Palabras clave para sentimientos en español (no se eliminan como stopwords)
+PALABRAS_IMPORTANTES_ES = {
+    'no', 'ni', 'nunca', 'jamás', 'tampoco', 'nada', 'nadie', 'ninguno', 'ninguna',
+    'sin', 'pero', 'muy', 'mucho', 'mucha', 'muchos', 'muchas', 'poco', 'más', 'menos',
+    'tan', 'tanto', 'siempre'
+}
 
 # Cargar stopwords
-def cargar_stopwords():
+def cargar_stopwords(idioma="en"):
     try:
         nltk.data.find('corpora/stopwords')
     except LookupError:
         print("📥 Descargando stopwords...")
         nltk.download('stopwords')
+
+    if idioma == "es":
+        return set(stopwords.words('spanish')) - PALABRAS_IMPORTANTES_ES
     
     stop_words = set(stopwords.words('english'))
     
@@ -45,65 +267,95 @@ def cargar_stopwords():
     return stop_words - palabras_importantes
 
 # 🔥 PREPROCESAMIENTO MEJORADO QUE PRESERVA NEGACIONES
+# (una sola pasada: ver app/preprocesamiento.py)
 def preprocesar_texto_mejorado(texto, stop_words):
-    texto = texto.lower().strip()
-    
-    # 🔥 CRÍTICO: Manejar negaciones uniéndolas a la siguiente palabra
-    texto = re.sub(r"won't", "will_not", texto)
-    texto = re.sub(r"can't", "can_not", texto)
-    texto = re.sub(r"n't", "_not", texto)
-    
-    # Reemplazar "not" por "_not_" para unirlo a la siguiente palabra
-    texto = re.sub(r"\bnot\b", "_not_", texto)
-    texto = re.sub(r"\bno\b", "_no_", texto)
-    texto = re.sub(r"\bnever\b", "_never_", texto)
-    
-    # Mantener signos de exclamación e interrogación
-    texto = re.sub(r'[^a-zA-Z\s!?_]', ' ', texto)
-    
-    # Reducir espacios múltiples
-    texto = re.sub(r'\s+', ' ', texto)
-    
-    # 🔥 Filtrar stopwords pero MANTENER NEGACIONES Y PALABRAS CLAVE
-    palabras = []
-    for palabra in texto.split():
-        # Mantener palabras con guiones bajos (negaciones) y palabras importantes
-        if '_' in palabra or palabra not in stop_words:
-            palabras.append(palabra)
-    
-    texto_procesado = ' '.join(palabras)
-    
-    return texto_procesado
+    return preprocesar(texto, stop_words)[0]
 
-def analizar_sentimiento(texto, modelo, stop_words):
-    # Preprocesar preservando negaciones
-    texto_procesado = preprocesar_texto_mejorado(texto, stop_words)
-    
-    # 🔥 DETECTAR PATRONES NEGATIVOS EXPLÍCITAMENTE
-    patrones_negativos = [
-        r'_not', r'_no', r'_never', r'\bnot\b', r'\bno\b', r'\bnever\b',
-        r'\bhate\b', r'\bhated\b', r'\bhating\b', r'\bterrible\b', 
-        r'\bawful\b', r'\bhorrible\b', r'\bboring\b', r'\bbored\b',
-        r'\bdislike\b', r'\bdisliked\b', r'\bworst\b', r'\bbad\b',
-        r'\bwaste\b', r'\brubbish\b', r'\bgarbage\b', r'\bstupid\b',
-        r'\bdumb\b', r'\bsucks\b', r'\bsucked\b'
-    ]
-    
-    patrones_positivos = [
-        r'\blove\b', r'\bloved\b', r'\bloving\b', r'\bgreat\b', 
-        r'\bamazing\b', r'\bawesome\b', r'\bfantastic\b', r'\bexcellent\b',
-        r'\bwonderful\b', r'\bbrilliant\b', r'\bperfect\b', r'\bbest\b',
-        r'\benjoyed\b', r'\benjoy\b', r'\bfun\b', r'\bfunny\b'
+def aplicar_reglas(prob_positiva, tiene_negacion, tiene_positivo):
+    """
+    Reglas de 3 clases vectorizadas. Recibe arrays de igual largo y devuelve
+    (sentimientos, porcentajes) como arrays de NumPy.
+    El porcentaje SIEMPRE representa positividad.
+    """
+    prob_positiva = np.asarray(prob_positiva, dtype=float)
+    tiene_negacion = np.asarray(tiene_negacion, dtype=bool)
+    tiene_positivo = np.asarray(tiene_positivo, dtype=bool)
+
+    # CASO 1: Negación fuerte sin palabras positivas → NEGATIVO (bajamos el porcentaje)
+    caso_1 = tiene_negacion & ~tiene_positivo
+    # CASO 2: Negación pero con palabras positivas (ej: "not bad")
+    caso_2 = tiene_negacion & tiene_positivo
+    # CASO 3: Palabras positivas sin negación → POSITIVO (subimos el porcentaje)
+    caso_3 = tiene_positivo & ~tiene_negacion
+    # CASO 4: Comportamiento normal del modelo
+    caso_4 = ~(tiene_negacion | tiene_positivo)
+
+    condiciones = [
+        caso_1,
+        caso_2 & (prob_positiva > 0.5),
+        caso_2,
+        caso_3 & (prob_positiva > 0.4),
+        caso_3,
+        caso_4 & (prob_positiva > 0.65),
+        caso_4 & (prob_positiva < 0.35),
     ]
-    
-    tiene_negacion = any(re.search(patron, texto_procesado, re.IGNORECASE) for patron in patrones_negativos)
-    tiene_positivo = any(re.search(patron, texto_procesado, re.IGNORECASE) for patron in patrones_positivos)
+    sentimientos = np.select(
+        condiciones,
+        ["NEGATIVO", "POSITIVO", "NEUTRO", "POSITIVO", "NEUTRO", "POSITIVO", "NEGATIVO"],
+        default="NEUTRO"
+    )
+    porcentajes = np.select(
+        condiciones,
+        [
+            np.maximum(0.0, prob_positiva - 0.3),
+            prob_positiva,
+            0.5,
+            np.minimum(1.0, prob_positiva + 0.2),
+            0.5,
+            prob_positiva,
+            prob_positiva,
+        ],
+        default=0.5
+    )
+    return sentimientos, porcentajes
+
+def _reglas_fallback(tiene_negacion, tiene_positivo):
+    """Clasificación basada sólo en patrones, para cuando el modelo falla."""
+    tiene_negacion = np.asarray(tiene_negacion, dtype=bool)
+    tiene_positivo = np.asarray(tiene_positivo, dtype=bool)
+    sentimientos = np.select([tiene_negacion, tiene_positivo], ["NEGATIVO", "POSITIVO"], default="NEUTRO")
+    porcentajes = np.select([tiene_negacion, tiene_positivo], [0.2, 0.8], default=0.5)
+    return sentimientos, porcentajes
+
+def _armar_resultado(sentimiento, porcentaje, texto_procesado, modelo_version=None):
+    sentimiento = str(sentimiento)
+    porcentaje = float(porcentaje)
+    return {
+        'resultado': sentimiento,
+        'porcentaje': porcentaje,  # Siempre representa positividad
+        'texto_procesado': texto_procesado,
+        'emoji': EMOJIS[sentimiento],
+        'confianza': porcentaje,
+        'modelo_version': modelo_version  # None si salió de las reglas de respaldo
+    }
+
+def analizar_sentimiento(texto, modelo, stop_words):
+    # Preprocesar preservando negaciones y 🔥 DETECTAR PATRONES en la misma pasada
+    # (con el preprocesado del idioma del modelo)
+    texto_procesado, tiene_negacion, tiene_positivo = PREPROCESADORES[idioma_modelo(modelo)](texto, stop_words)
     
     # Debug info
     print(f"🔍 ANALIZANDO: '{texto}'")
     print(f"   Procesado: '{texto_procesado}'")
     print(f"   Tiene negación: {tiene_negacion}")
     print(f"   Tiene positivo: {tiene_positivo}")
+
+    version = obtener_version_modelo(modelo)
+    clave = _clave_cache(version, texto_procesado)
+    encontrado, resultado = cache_sentimientos.obtener(clave)
+    if encontrado:
+        print("   ♻️ Resultado en caché")
+        return dict(resultado)
     
     try:
         probabilidades = modelo.predict_proba([texto_procesado])
@@ -112,81 +364,66 @@ def analizar_sentimiento(texto, modelo, stop_words):
         print(f"   Probabilidad base: {prob_positiva:.3f}")
         
         # 🔥 REGLAS INTELIGENTES - SIEMPRE USAR prob_positiva COMO PORCENTAJE FINAL
-        
-        # CASO 1: Negación fuerte sin palabras positivas → NEGATIVO (bajamos el porcentaje)
-        if tiene_negacion and not tiene_positivo:
-            sentimiento = "NEGATIVO"
-            porcentaje_final = max(0.0, prob_positiva - 0.3)  # Bajamos el porcentaje
-            print("   🎯 Aplicando regla: Negación fuerte -> NEGATIVO")
-        
-        # CASO 2: Negación pero con palabras positivas (ej: "not bad") 
-        elif tiene_negacion and tiene_positivo:
-            if prob_positiva > 0.5:
-                sentimiento = "POSITIVO"
-                porcentaje_final = prob_positiva
-                print("   🎯 Aplicando regla: Negación + positivo -> POSITIVO")
-            else:
-                sentimiento = "NEUTRO"
-                porcentaje_final = 0.5  # Forzar neutro
-                print("   🎯 Aplicando regla: Negación + positivo -> NEUTRO")
-        
-        # CASO 3: Palabras positivas sin negación → POSITIVO (subimos el porcentaje)
-        elif tiene_positivo and not tiene_negacion:
-            if prob_positiva > 0.4:
-                sentimiento = "POSITIVO"
-                porcentaje_final = min(1.0, prob_positiva + 0.2)  # Subimos el porcentaje
-                print("   🎯 Aplicando regla: Positivo claro -> POSITIVO")
-            else:
-                sentimiento = "NEUTRO"
-                porcentaje_final = 0.5
-        
-        # CASO 4: Comportamiento normal del modelo
-        else:
-            if prob_positiva > 0.65:
-                sentimiento = "POSITIVO"
-                porcentaje_final = prob_positiva
-            elif prob_positiva < 0.35:
-                sentimiento = "NEGATIVO"
-                porcentaje_final = prob_positiva  # Mantenemos bajo para negativo
-            else:
-                sentimiento = "NEUTRO"
-                porcentaje_final = 0.5
-            print("   🎯 Aplicando regla: Modelo base")
-        
-        # Asignar emoji
-        emoji = "😊" if sentimiento == "POSITIVO" else "😠" if sentimiento == "NEGATIVO" else "😐"
-        
-        return {
-            'resultado': sentimiento,
-            'porcentaje': porcentaje_final,  # Siempre representa positividad
-            'texto_procesado': texto_procesado,
-            'emoji': emoji,
-            'confianza': porcentaje_final
-        }
+        sentimientos, porcentajes = aplicar_reglas([prob_positiva], [tiene_negacion], [tiene_positivo])
         
     except Exception as e:
         print(f"❌ Error en predicción: {e}")
-        # Fallback basado en detección de patrones
-        if tiene_negacion:
-            sentimiento_fallback = "NEGATIVO"
-            confianza_fallback = 0.2  # Bajo porque es negativo
-            emoji_fallback = "😠"
-        elif tiene_positivo:
-            sentimiento_fallback = "POSITIVO" 
-            confianza_fallback = 0.8  # Alto porque es positivo
-            emoji_fallback = "😊"
-        else:
-            sentimiento_fallback = "NEUTRO"
-            confianza_fallback = 0.5  # Medio porque es neutro
-            emoji_fallback = "😐"
-            
-        return {
-            'resultado': sentimiento_fallback,
-            'porcentaje': confianza_fallback,
-            'texto_procesado': texto_procesado,
-            'emoji': emoji_fallback,
-            'confianza': confianza_fallback
-        }
+        # Fallback basado en detección de patrones (no se guarda en caché)
+        sentimientos, porcentajes = _reglas_fallback([tiene_negacion], [tiene_positivo])
+        return _armar_resultado(sentimientos[0], porcentajes[0], texto_procesado)
+    
+    resultado = _armar_resultado(sentimientos[0], porcentajes[0], texto_procesado, version)
+    cache_sentimientos.guardar(clave, resultado)
+    return dict(resultado)
+
+def analizar_sentimientos_lote(textos, modelo, stop_words):
+    """
+    Analiza muchas reseñas con UNA sola llamada a predict_proba.
+    Devuelve una lista de resultados en el mismo orden que `textos`,
+    con el mismo formato que analizar_sentimiento (sin prints por reseña).
+    """
+    if not textos:
+        return []
+
+    preprocesar_idioma = PREPROCESADORES[idioma_modelo(modelo)]
+    textos_procesados, tiene_negacion, tiene_positivo = zip(*(preprocesar_idioma(texto, stop_words) for texto in textos))
+    textos_procesados = list(textos_procesados)
+    tiene_negacion = np.array(tiene_negacion, dtype=bool)
+    tiene_positivo = np.array(tiene_positivo, dtype=bool)
+
+    # Sólo los textos que no están en caché pasan por el modelo
+    resultados = [None] * len(textos)
+    pendientes = list(range(len(textos)))
+    claves = None
+    version = obtener_version_modelo(modelo)
+    if cache_sentimientos.activa:
+        claves = [_clave_cache(version, texto_procesado) for texto_procesado in textos_procesados]
+        pendientes = []
+        for i, clave in enumerate(claves):
+            encontrado, resultado = cache_sentimientos.obtener(clave)
+            if encontrado:
+                resultados[i] = dict(resultado)
+            else:
+                pendientes.append(i)
+    if not pendientes:
+        return resultados
+
+    cachear = claves is not None
+    try:
+        prob_positiva = modelo.predict_proba([textos_procesados[i] for i in pendientes])[:, 1]
+        sentimientos, porcentajes = aplicar_reglas(prob_positiva, tiene_negacion[pendientes], tiene_positivo[pendientes])
+    except Exception as e:
+        print(f"❌ Error en predicción por lote ({len(pendientes)} textos): {e}")
+        sentimientos, porcentajes = _reglas_fallback(tiene_negacion[pendientes], tiene_positivo[pendientes])
+        cachear = False
+        version = None
+
+    for i, sentimiento, porcentaje in zip(pendientes, sentimientos, porcentajes):
+        resultado = _armar_resultado(sentimiento, porcentaje, textos_procesados[i], version)
+        if cachear:
+            cache_sentimientos.guardar(claves[i], resultado)
+        resultados[i] = dict(resultado)
+    return resultados
 
 
 
@@ -0,0 +1,79 @@
+# app/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Cache en memoria acotado por cantidad de entradas (se desaloja la usada
+    hace más tiempo) y por antigüedad (`ttl_s`; 0 = sin vencimiento).
+    Seguro para usar desde varios hilos. Con tamano_max=0 queda desactivada.
+    """
+
+    def __init__(self, tamano_max: int = 10000, ttl_s: float = 0):
+        self.tamano_max = max(tamano_max, 0)
+        self.ttl_s = ttl_s
+        self._datos = OrderedDict()  # clave -> (vence, valor)
+        self._lock = threading.Lock()
+        self._aciertos = 0
+        self._fallos = 0
+        self._desalojos = 0
+
+    @property
+    def activa(self) -> bool:
+        return self.tamano_max > 0
+
+    def obtener(self, clave):
+        """Devuelve (encontrado, valor)."""
+        if not self.activa:
+            return False, None
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None:
+                vence, valor = entrada
+                if vence is None or vence > time.monotonic():
+                    self._datos.move_to_end(clave)
+                    self._aciertos += 1
+                    return True, valor
+                del self._datos[clave]
+            self._fallos += 1
+            return False, None
+
+    def guardar(self, clave, valor):
+        if not self.activa:
+            return
+        vence = time.monotonic() + self.ttl_s if self.ttl_s > 0 else None
+        with self._lock:
+            self._datos[clave] = (vence, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.tamano_max:
+                self._datos.popitem(last=False)
+                self._desalojos += 1
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def invalidar_donde(self, condicion):
+        """Borra las entradas cuya clave cumple `condicion(clave)`."""
+        with self._lock:
+            for clave in [clave for clave in self._datos if condicion(clave)]:
+                del self._datos[clave]
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def metricas(self) -> dict:
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                "tamano": len(self._datos),
+                "tamano_max": self.tamano_max,
+                "ttl_s": self.ttl_s,
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "tasa_aciertos": self._aciertos / consultas if consultas else 0.0,
+                "desalojos": self._desalojos,
+            }
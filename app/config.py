@@ -0,0 +1,133 @@
+# app/config.py
+import os
+from dotenv import load_dotenv
+
+# Cargar variables del archivo .env
+load_dotenv()
+
+
+def _env_bool(nombre: str, por_defecto: bool) -> bool:
+    valor = os.getenv(nombre)
+    if valor is None:
+        return por_defecto
+    return valor.strip().lower() in ("1", "true", "si", "sí", "yes", "on")
+
+
+# --- Micro-lotes de inferencia (/crear-resena/) ---
+# Junta las llamadas concurrentes a analizar_sentimiento durante una ventana
+# corta y las resuelve con un solo predict_proba.
+INFERENCIA_MICROLOTES = _env_bool("INFERENCIA_MICROLOTES", True)
+INFERENCIA_LOTE_ESPERA_MS = float(os.getenv("INFERENCIA_LOTE_ESPERA_MS", "5"))
+INFERENCIA_LOTE_MAX = int(os.getenv("INFERENCIA_LOTE_MAX", "64"))
+
+# --- /crear-resena/ sin bloquear el event loop ---
+# Traducción asíncrona con timeout e inferencia en un ejecutor acotado
+# (la BD ya es asíncrona en todos los endpoints). Con False la traducción y
+# el modelo corren en el event loop como en el flujo original.
+RESENA_NO_BLOQUEANTE = _env_bool("RESENA_NO_BLOQUEANTE", True)
+TRADUCCION_TIMEOUT_S = float(os.getenv("TRADUCCION_TIMEOUT_S", "3"))
+TRADUCCION_HILOS = int(os.getenv("TRADUCCION_HILOS", "4"))
+INFERENCIA_HILOS = int(os.getenv("INFERENCIA_HILOS", "2"))
+
+# --- Backend de inferencia ---
+# "hilo_actual" (sin pool), "hilos" (INFERENCIA_HILOS hilos) o
+# "procesos" (INFERENCIA_PROCESOS procesos, cada uno con su copia del modelo)
+INFERENCIA_BACKEND = os.getenv("INFERENCIA_BACKEND", "hilos").strip().lower()
+INFERENCIA_PROCESOS = int(os.getenv("INFERENCIA_PROCESOS", str(os.cpu_count() or 1)))
+
+# --- Formato del modelo ---
+# "pipeline": sentimiento_pipeline.pkl (joblib). "compacto": directorio
+# sentimiento_compacto/ exportado por entrenamiento.py, mapeado en memoria.
+MODELO_FORMATO = os.getenv("MODELO_FORMATO", "pipeline").strip().lower()
+
+# --- Caché de resultados de sentimiento ---
+# Cantidad máxima de entradas (0 la desactiva) y vencimiento en segundos (0 = sin vencimiento)
+CACHE_SENTIMIENTO_TAMANO = int(os.getenv("CACHE_SENTIMIENTO_TAMANO", "20000"))
+CACHE_SENTIMIENTO_TTL_S = float(os.getenv("CACHE_SENTIMIENTO_TTL_S", "3600"))
+
+# --- Detección de idioma local ---
+# Con True el idioma se detecta sin red y sólo el texto que es español con
+# confianza >= IDIOMA_CONFIANZA_MIN se envía al traductor.
+IDIOMA_DETECCION_LOCAL = _env_bool("IDIOMA_DETECCION_LOCAL", True)
+IDIOMA_CONFIANZA_MIN = float(os.getenv("IDIOMA_CONFIANZA_MIN", "0.7"))
+
+# --- Caché persistente de traducciones ---
+# Archivo SQLite compartido por la API y machine-learning/modelo-final.py
+# (vacío = sin caché). TRADUCCION_MAX_CARACTERES es el tamaño máximo de cada
+# llamada al traductor cuando se traducen varios textos juntos.
+TRADUCCION_CACHE_RUTA = os.getenv("TRADUCCION_CACHE_RUTA", "traducciones_cache.sqlite3")
+TRADUCCION_MAX_CARACTERES = int(os.getenv("TRADUCCION_MAX_CARACTERES", "4500"))
+
+# --- Modelo nativo en español ---
+# Con True, si existe machine-learning/sentimiento_pipeline_es.pkl (o
+# sentimiento_compacto_es/), las reseñas detectadas en español se analizan
+# directamente con ese modelo, sin pasar por el traductor.
+MODELO_ES = _env_bool("MODELO_ES", True)
+
+# --- Recarga del modelo sin reiniciar ---
+# Cada cuántos segundos se revisa si cambió el modelo en disco (nombre, fecha y
+# tamaño) para cargarlo, calentarlo y ponerlo en uso; 0 = sólo con
+# POST /admin/modelo/recargar
+MODELO_RECARGA_S = float(os.getenv("MODELO_RECARGA_S", "0"))
+# POST /admin/modelo/recargar exige el encabezado X-Admin-Token con este valor;
+# sin definir, el endpoint responde 403 (la recarga queda sólo por MODELO_RECARGA_S)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# --- Pool de conexiones a la base de datos ---
+# Se aplica al motor primario y a la réplica de lectura (DB_HOST_LECTURA).
+DB_POOL_TAMANO = int(os.getenv("DB_POOL_TAMANO", "5"))
+DB_POOL_MAX_EXTRA = int(os.getenv("DB_POOL_MAX_EXTRA", "10"))
+DB_POOL_TIMEOUT_S = float(os.getenv("DB_POOL_TIMEOUT_S", "30"))
+DB_POOL_RECICLAR_S = int(os.getenv("DB_POOL_RECICLAR_S", "1800"))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+# --- Paginación ---
+# Tamaño máximo de página de los listados (un `limit` mayor se recorta)
+PAGINA_TAMANO_MAX = int(os.getenv("PAGINA_TAMANO_MAX", "500"))
+
+# --- Ingesta asíncrona de reseñas ---
+# /crear-resena/ guarda la reseña como PENDIENTE y responde 202 con el id;
+# la traducción y el modelo corren en trabajadores en segundo plano (app/ingesta.py)
+RESENA_ASINCRONA = _env_bool("RESENA_ASINCRONA", False)
+INGESTA_TRABAJADORES = int(os.getenv("INGESTA_TRABAJADORES", "1"))
+INGESTA_LOTE_MAX = int(os.getenv("INGESTA_LOTE_MAX", "64"))
+
+# --- Importación masiva ---
+# Registros por lote de /importar y `python -m app.importacion`: un predict_proba,
+# un INSERT multi-fila y un commit por lote (acota la memoria)
+IMPORTACION_LOTE = int(os.getenv("IMPORTACION_LOTE", "1000"))
+# Tope del `tamano_lote` que acepta /importar (uno mayor se recorta)
+IMPORTACION_LOTE_MAX = int(os.getenv("IMPORTACION_LOTE_MAX", "5000"))
+
+# --- Reevaluación con el modelo actual ---
+# `python -m app.reevaluacion`: reviews por lote (un predict_proba, un UPDATE masivo
+# y un commit) y archivo donde se anota el último idReview confirmado
+REEVALUACION_LOTE = int(os.getenv("REEVALUACION_LOTE", "1000"))
+REEVALUACION_PROGRESO = os.getenv("REEVALUACION_PROGRESO", "reevaluacion_progreso.json")
+
+# --- Ranking de películas ---
+# Peso del promedio global en el puntaje bayesiano (equivale a N reviews "promedio"
+# sumadas a cada película): con pocas reviews el puntaje queda cerca de la media
+RANKING_PESO_PREVIO = float(os.getenv("RANKING_PESO_PREVIO", "10"))
+# Cada cuántos segundos se recarga desde la base (recoge reviews de otros workers
+# y recalcula la media global); 0 = sólo al arrancar
+RANKING_RECARGA_S = float(os.getenv("RANKING_RECARGA_S", "300"))
+RANKING_TOP_MAX = int(os.getenv("RANKING_TOP_MAX", "100"))
+
+# --- Detalle de película ---
+# Caché de /peliculas/detalle/{id}. Crear una review invalida la película en este
+# proceso; el TTL corto acota lo desactualizado que ven los demás workers
+DETALLE_CACHE_TAMANO = int(os.getenv("DETALLE_CACHE_TAMANO", "1000"))
+DETALLE_CACHE_TTL_S = float(os.getenv("DETALLE_CACHE_TTL_S", "5"))
+
+# --- Arranque ---
+# Con True, importar main.py no carga el traductor, los modelos ni el esquema:
+# se inicializan en segundo plano después de abrir el puerto. /health/live
+# responde enseguida y /health/ready (y el resto de la API) recién cuando el
+# modelo y el pool de la base están listos
+INICIO_DIFERIDO = _env_bool("INICIO_DIFERIDO", False)
+
+# --- Esquema de la base ---
+# create_all al arrancar es cómodo en desarrollo; en producción el esquema lo
+# manejan las migraciones (`alembic upgrade head`) y conviene DB_CREAR_TABLAS=false
+DB_CREAR_TABLAS = _env_bool("DB_CREAR_TABLAS", True)
@@ -1,15 +1,23 @@
 # app/crud.py
 from sqlalchemy.orm import Session
-from . import models, schemas
+from . import models, schemas, estadisticas
 from typing import Optional
-from sqlalchemy import func
+
+def _paginar(query, columna_id, skip: int, limit: Optional[int], despues_de: Optional[int]):
+    """Mismo criterio que crud_async._paginar: orden por clave primaria y cursor `despues_de`."""
+    query = query.order_by(columna_id)
+    if despues_de is not None:
+        query = query.filter(columna_id > despues_de)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit) if limit is not None else query
 
 # CRUD para Usuarios
 def get_usuario(db: Session, usuario_id: int):
     return db.query(models.Usuario).filter(models.Usuario.idUsuario == usuario_id).first()
 
-def get_usuarios(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Usuario).offset(skip).limit(limit).all()
+def get_usuarios(db: Session, skip: int = 0, limit: int = 100, despues_de: Optional[int] = None):
+    return _paginar(db.query(models.Usuario), models.Usuario.idUsuario, skip, limit, despues_de).all()
 
 def get_usuario_by_email(db: Session, email: str):
     return db.query(models.Usuario).filter(models.Usuario.correoUsuario == email).first()
@@ -35,22 +43,20 @@ def get_peliculas(
     db: Session, 
     skip: int = 0, 
     limit: int = 100, 
-    titulo: Optional[str] = None 
+    titulo: Optional[str] = None,
+    despues_de: Optional[int] = None
 ):
     query = db.query(models.Pelicula) 
     
     if titulo: 
         query = query.filter(models.Pelicula.tituloPelicula.ilike(f"%{titulo}%"))
         
-    return query.offset(skip).limit(limit).all()
+    return _paginar(query, models.Pelicula.idPelicula, skip, limit, despues_de).all()
 
 
-def buscar_peliculas(db: Session, q: str):
-    return (
-        db.query(models.Pelicula)
-        .filter(models.Pelicula.tituloPelicula.like(f"%{q}%"))
-        .all()
-    )
+def buscar_peliculas(db: Session, q: str, limit: Optional[int] = 100, despues_de: Optional[int] = None):
+    query = db.query(models.Pelicula).filter(models.Pelicula.tituloPelicula.like(f"%{q}%"))
+    return _paginar(query, models.Pelicula.idPelicula, 0, limit, despues_de).all()
 
 def get_pelicula_by_titulo(db: Session, titulo: str):
     return db.query(models.Pelicula).filter(models.Pelicula.tituloPelicula == titulo).first()
@@ -65,6 +71,7 @@ def create_pelicula(db: Session, pelicula: schemas.PeliculaCreate):
         poster_url=pelicula.poster_url
         # Agrega más campos si es necesario
     )
+    db_pelicula.estadisticas = models.EstadisticaPelicula()  # agregados en cero
     db.add(db_pelicula)
     db.commit()
     db.refresh(db_pelicula)
@@ -74,8 +81,8 @@ def create_pelicula(db: Session, pelicula: schemas.PeliculaCreate):
 def get_review(db: Session, review_id: int):
     return db.query(models.Review).filter(models.Review.idReview == review_id).first()
 
-def get_reviews(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Review).offset(skip).limit(limit).all()
+def get_reviews(db: Session, skip: int = 0, limit: int = 100, despues_de: Optional[int] = None):
+    return _paginar(db.query(models.Review), models.Review.idReview, skip, limit, despues_de).all()
 
 def create_review(db: Session, review: schemas.ReviewCreate):
     db_review = models.Review(
@@ -83,28 +90,35 @@ def create_review(db: Session, review: schemas.ReviewCreate):
         numPersonaReview=review.numPersonaReview,
         numPeliculareview=review.numPeliculareview,
         resultado_review=review.resultado_review,
-        porcentaje_review=review.porcentaje_review
+        porcentaje_review=review.porcentaje_review,
+        modelo_version=review.modelo_version
     )
     db.add(db_review)
+    _sumar_estadisticas(db, review)
     db.commit()
     db.refresh(db_review)
 
     return db_review
 
+def _sumar_estadisticas(db: Session, review: schemas.ReviewCreate):
+    """Suma la review a EstadisticasPeliculas en la transacción en curso."""
+    datos = (review.numPeliculareview, review.resultado_review, review.porcentaje_review)
+    if db.execute(estadisticas.sentencia_sumar(*datos)).rowcount == 0:
+        db.execute(estadisticas.sentencia_insertar(*datos))
 
-def get_reviews_by_usuario(db: Session, usuario_id: int):
-    return db.query(models.Review).filter(models.Review.numPersonaReview == usuario_id).all()
 
-def get_reviews_by_pelicula(db: Session, pelicula_id: int):
-    return db.query(models.Review).filter(models.Review.numPeliculareview == pelicula_id).all()
+def get_reviews_by_usuario(db: Session, usuario_id: int, limit: Optional[int] = 100, despues_de: Optional[int] = None):
+    query = db.query(models.Review).filter(models.Review.numPersonaReview == usuario_id)
+    return _paginar(query, models.Review.idReview, 0, limit, despues_de).all()
+
+def get_reviews_by_pelicula(db: Session, pelicula_id: int, limit: Optional[int] = 100, despues_de: Optional[int] = None):
+    query = db.query(models.Review).filter(models.Review.numPeliculareview == pelicula_id)
+    return _paginar(query, models.Review.idReview, 0, limit, despues_de).all()
 
 
 
 
 def get_valoracion_by_pelicula(db: Session, pelicula_id: int):
-    promedio = (
-        db.query(func.avg(models.Review.porcentaje_review))
-        .filter(models.Review.numPeliculareview == pelicula_id)
-        .scalar()
-    )
-    return promedio
+    # Promedio desde EstadisticasPeliculas (lectura por clave, sin AVG sobre Reviews)
+    fila = db.execute(estadisticas.consulta_estadisticas(pelicula_id)).scalars().first()
+    return fila.valoracion if fila else None
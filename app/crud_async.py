@@ -0,0 +1,275 @@
+# app/crud_async.py
+# Misma API que app/crud.py sobre AsyncSession: los endpoints hacen
+# `await crud_async.get_...(db, ...)` y la consulta no ocupa un hilo.
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from . import models, schemas, estadisticas
+from typing import Optional
+
+async def _primero(db: AsyncSession, consulta):
+    return (await db.execute(consulta)).scalars().first()
+
+async def _todos(db: AsyncSession, consulta):
+    return (await db.execute(consulta)).scalars().all()
+
+def _paginar(consulta, columna_id, skip: int, limit: Optional[int], despues_de: Optional[int]):
+    """
+    Ordena por la clave primaria y pagina por cursor (`despues_de`: último id de
+    la página anterior). Sin cursor se mantiene el offset `skip` por compatibilidad.
+    """
+    consulta = consulta.order_by(columna_id)
+    if despues_de is not None:
+        consulta = consulta.where(columna_id > despues_de)
+    elif skip:
+        consulta = consulta.offset(skip)
+    return consulta.limit(limit) if limit is not None else consulta
+
+async def _guardar(db: AsyncSession, objeto):
+    db.add(objeto)
+    await db.commit()
+    await db.refresh(objeto)
+    return objeto
+
+# CRUD para Usuarios
+async def get_usuario(db: AsyncSession, usuario_id: int):
+    return await _primero(db, select(models.Usuario).where(models.Usuario.idUsuario == usuario_id))
+
+async def get_usuarios(db: AsyncSession, skip: int = 0, limit: int = 100, despues_de: Optional[int] = None):
+    return await _todos(db, _paginar(select(models.Usuario), models.Usuario.idUsuario, skip, limit, despues_de))
+
+async def get_usuario_by_email(db: AsyncSession, email: str):
+    return await _primero(db, select(models.Usuario).where(models.Usuario.correoUsuario == email))
+
+def _nuevo_usuario(usuario: schemas.UsuarioCreate):
+    return models.Usuario(
+        nombreUsuario=usuario.nombreUsuario,
+        apellidoUsuario=usuario.apellidoUsuario,
+        correoUsuario=usuario.correoUsuario,
+        sexoUsuario=usuario.sexoUsuario,
+        generoFavUsuario=usuario.generoFavUsuario
+    )
+
+async def create_usuario(db: AsyncSession, usuario: schemas.UsuarioCreate):
+    return await _guardar(db, _nuevo_usuario(usuario))
+
+# CRUD para Películas
+async def get_pelicula(db: AsyncSession, pelicula_id: int):
+    return await _primero(db, select(models.Pelicula).where(models.Pelicula.idPelicula == pelicula_id))
+
+async def get_peliculas(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    titulo: Optional[str] = None,
+    despues_de: Optional[int] = None
+):
+    consulta = select(models.Pelicula)
+
+    if titulo:
+        consulta = consulta.where(models.Pelicula.tituloPelicula.ilike(f"%{titulo}%"))
+
+    return await _todos(db, _paginar(consulta, models.Pelicula.idPelicula, skip, limit, despues_de))
+
+def consulta_peliculas_con_reviews():
+    """
+    Películas con al menos una review, con EXISTS: por cada película (en orden de
+    id) basta una búsqueda en el índice (numPeliculareview, ...) hasta llenar la
+    página, sin recorrer ni agrupar toda la tabla Reviews.
+    """
+    return select(models.Pelicula).where(
+        select(models.Review.idReview)
+        .where(models.Review.numPeliculareview == models.Pelicula.idPelicula)
+        .exists()
+    )
+
+async def get_peliculas_con_reviews(
+    db: AsyncSession, skip: int = 0, limit: int = 100, despues_de: Optional[int] = None
+):
+    return await _todos(db, _paginar(consulta_peliculas_con_reviews(), models.Pelicula.idPelicula, skip, limit, despues_de))
+
+async def buscar_peliculas(db: AsyncSession, q: str, limit: Optional[int] = 100, despues_de: Optional[int] = None):
+    consulta = select(models.Pelicula).where(models.Pelicula.tituloPelicula.like(f"%{q}%"))
+    return await _todos(db, _paginar(consulta, models.Pelicula.idPelicula, 0, limit, despues_de))
+
+async def get_pelicula_by_titulo(db: AsyncSession, titulo: str):
+    return await _primero(db, select(models.Pelicula).where(models.Pelicula.tituloPelicula == titulo))
+
+async def create_pelicula(db: AsyncSession, pelicula: schemas.PeliculaCreate):
+    db_pelicula = models.Pelicula(
+        tituloPelicula=pelicula.tituloPelicula,
+        directorPelicula=pelicula.directorPelicula,
+        añoPelicula=pelicula.añoPelicula,
+        generos=pelicula.generos,
+        poster_url=pelicula.poster_url
+    )
+    db_pelicula.estadisticas = models.EstadisticaPelicula()  # agregados en cero
+    return await _guardar(db, db_pelicula)
+
+# CRUD para Reviews
+async def get_review(db: AsyncSession, review_id: int):
+    return await _primero(db, select(models.Review).where(models.Review.idReview == review_id))
+
+async def get_reviews(db: AsyncSession, skip: int = 0, limit: int = 100, despues_de: Optional[int] = None):
+    return await _todos(db, _paginar(select(models.Review), models.Review.idReview, skip, limit, despues_de))
+
+def _nueva_review(review: schemas.ReviewCreate):
+    return models.Review(
+        textReview=review.textReview,
+        numPersonaReview=review.numPersonaReview,
+        numPeliculareview=review.numPeliculareview,
+        resultado_review=review.resultado_review,
+        porcentaje_review=review.porcentaje_review,
+        modelo_version=review.modelo_version
+    )
+
+async def create_review(db: AsyncSession, review: schemas.ReviewCreate):
+    await _sumar_estadisticas(db, review)
+    return await _guardar(db, _nueva_review(review))
+
+async def _sumar_estadisticas(db: AsyncSession, review):
+    """Suma la review a EstadisticasPeliculas; el commit que sigue cubre ambas escrituras."""
+    datos = (review.numPeliculareview, review.resultado_review, review.porcentaje_review)
+    if (await db.execute(estadisticas.sentencia_sumar(*datos))).rowcount == 0:
+        await db.execute(estadisticas.sentencia_insertar(*datos))
+
+async def _review_con_usuario(db: AsyncSession, usuario: schemas.UsuarioCreate, pendiente: bool, **campos_review):
+    db_usuario = await get_usuario_by_email(db, usuario.correoUsuario)
+    if db_usuario is None:
+        db_usuario = _nuevo_usuario(usuario)
+        db.add(db_usuario)
+        await db.flush()  # INSERT del usuario para conocer su id; sigue sin commit
+    review = schemas.ReviewCreate(numPersonaReview=db_usuario.idUsuario, **campos_review)
+    db_review = _nueva_review(review)
+    if pendiente:
+        # Se suma a las estadísticas cuando se analiza (completar_reviews)
+        db_review.estado_review = models.REVIEW_PENDIENTE
+    else:
+        await _sumar_estadisticas(db, review)
+    db.add(db_review)
+    await db.commit()
+    return db_usuario, db_review
+
+async def create_review_con_usuario(
+    db: AsyncSession,
+    usuario: schemas.UsuarioCreate,
+    pelicula_id: int,
+    texto: str,
+    resultado: Optional[str] = None,
+    porcentaje: Optional[float] = None,
+    modelo_version: Optional[str] = None,
+    pendiente: bool = False
+):
+    """
+    Busca o crea el usuario (por correo) e inserta su review en UNA transacción
+    con un solo commit: si algo falla no queda el usuario creado sin su review.
+    `pendiente=True` la guarda sin analizar, para la ingesta asíncrona.
+    Devuelve (usuario, review), ya con ids.
+    """
+    campos_review = dict(
+        numPeliculareview=pelicula_id, textReview=texto, resultado_review=resultado, porcentaje_review=porcentaje,
+        modelo_version=modelo_version
+    )
+    try:
+        return await _review_con_usuario(db, usuario, pendiente, **campos_review)
+    except IntegrityError:
+        # Otro pedido creó el mismo usuario entre la búsqueda y el INSERT: ahora existe
+        await db.rollback()
+        return await _review_con_usuario(db, usuario, pendiente, **campos_review)
+
+async def get_reviews_pendientes(db: AsyncSession):
+    """(idReview, textReview) de las reviews que esperan análisis, en orden de llegada."""
+    consulta = (
+        select(models.Review.idReview, models.Review.textReview)
+        .where(models.Review.estado_review == models.REVIEW_PENDIENTE)
+        .order_by(models.Review.idReview)
+    )
+    return (await db.execute(consulta)).all()
+
+async def completar_reviews(db: AsyncSession, resultados):
+    """
+    Escribe [(idReview, resultado, porcentaje, modelo_version)] de reviews PENDIENTE y las suma a
+    las estadísticas, todo en una transacción. FOR UPDATE + filtro por estado:
+    si otro proceso ya las completó, se saltean (no se cuentan dos veces).
+    Devuelve las reviews completadas.
+    """
+    por_id = {review_id: valores for review_id, *valores in resultados}
+    reviews = await _todos(db, (
+        select(models.Review)
+        .where(models.Review.idReview.in_(por_id), models.Review.estado_review == models.REVIEW_PENDIENTE)
+        .order_by(models.Review.idReview)
+        .with_for_update()
+    ))
+    for review in reviews:
+        review.resultado_review, review.porcentaje_review, review.modelo_version = por_id[review.idReview]
+        review.estado_review = models.REVIEW_LISTA
+        await _sumar_estadisticas(db, review)
+    await db.commit()
+    return reviews
+
+async def marcar_reviews_error(db: AsyncSession, review_ids):
+    await db.execute(
+        update(models.Review)
+        .where(models.Review.idReview.in_(review_ids), models.Review.estado_review == models.REVIEW_PENDIENTE)
+        .values(estado_review=models.REVIEW_ERROR)
+    )
+    await db.commit()
+
+async def get_reviews_by_usuario(
+    db: AsyncSession, usuario_id: int, limit: Optional[int] = 100, despues_de: Optional[int] = None
+):
+    consulta = select(models.Review).where(models.Review.numPersonaReview == usuario_id)
+    return await _todos(db, _paginar(consulta, models.Review.idReview, 0, limit, despues_de))
+
+async def get_reviews_by_pelicula(
+    db: AsyncSession, pelicula_id: int, limit: Optional[int] = 100, despues_de: Optional[int] = None
+):
+    consulta = select(models.Review).where(models.Review.numPeliculareview == pelicula_id)
+    return await _todos(db, _paginar(consulta, models.Review.idReview, 0, limit, despues_de))
+
+async def get_valoracion_by_pelicula(db: AsyncSession, pelicula_id: int):
+    # Promedio desde EstadisticasPeliculas (lectura por clave, sin AVG sobre Reviews)
+    fila = await _primero(db, estadisticas.consulta_estadisticas(pelicula_id))
+    return fila.valoracion if fila else None
+
+async def get_detalle_pelicula(
+    db: AsyncSession, pelicula_id: int, limit: int = 100, despues_de: Optional[int] = None
+):
+    """
+    Película, sus estadísticas y una página de reviews en una sola consulta
+    (LEFT JOIN contra la página ya limitada). None si la película no existe.
+    """
+    pagina = _paginar(
+        select(models.Review).where(models.Review.numPeliculareview == pelicula_id),
+        models.Review.idReview, 0, limit, despues_de
+    ).subquery()
+    review = aliased(models.Review, pagina)
+    consulta = (
+        select(models.Pelicula, models.EstadisticaPelicula, review)
+        .outerjoin(models.EstadisticaPelicula, models.EstadisticaPelicula.idPelicula == models.Pelicula.idPelicula)
+        .outerjoin(review, review.numPeliculareview == models.Pelicula.idPelicula)
+        .where(models.Pelicula.idPelicula == pelicula_id)
+        .order_by(review.idReview)
+    )
+    filas = (await db.execute(consulta)).all()
+    if not filas:
+        return None
+    pelicula, estadisticas, _ = filas[0]
+    return pelicula, estadisticas, [fila[2] for fila in filas if fila[2] is not None]
+
+async def get_estadisticas_ranking(db: AsyncSession):
+    """(idPelicula, totalReviews, reviewsPositivas) de las películas con reviews."""
+    tabla = models.EstadisticaPelicula
+    consulta = select(tabla.idPelicula, tabla.totalReviews, tabla.reviewsPositivas).where(tabla.totalReviews > 0)
+    return (await db.execute(consulta)).all()
+
+async def get_peliculas_por_ids(db: AsyncSession, ids: list[int]):
+    """{idPelicula: Pelicula} en una sola consulta."""
+    if not ids:
+        return {}
+    peliculas = await _todos(db, select(models.Pelicula).where(models.Pelicula.idPelicula.in_(ids)))
+    return {pelicula.idPelicula: pelicula for pelicula in peliculas}
+
+async def contar(db: AsyncSession, modelo):
+    return (await db.execute(select(func.count()).select_from(modelo))).scalar()
@@ -0,0 +1,124 @@
+# app/estadisticas.py
+# Agregados por película (tabla EstadisticasPeliculas). create_review suma cada
+# review nueva en la misma transacción, así la valoración de una película es una
+# lectura por clave primaria y no un AVG() que crece con la cantidad de reviews.
+#
+#   python -m app.estadisticas    # recalcula todo desde Reviews
+#
+# La reconstrucción borra y vuelve a insertar en una transacción; conviene
+# correrla con poco tráfico de escritura.
+from sqlalchemy import case, delete, func, insert, select, update
+from app import models
+
+# Contador que suma cada resultado del modelo
+COLUMNA_RESULTADO = {
+    "POSITIVO": "reviewsPositivas",
+    "NEGATIVO": "reviewsNegativas",
+    "NEUTRO": "reviewsNeutras",
+}
+
+
+def _incrementos(resultado, porcentaje):
+    # Las reviews sin porcentaje cuentan en el total pero no en el promedio (como AVG)
+    incrementos = {
+        "totalReviews": 1,
+        "sumaPorcentaje": porcentaje or 0,
+        "reviewsConPorcentaje": int(porcentaje is not None),
+    }
+    if resultado in COLUMNA_RESULTADO:
+        incrementos[COLUMNA_RESULTADO[resultado]] = 1
+    return incrementos
+
+
+def incrementos_por_pelicula(reviews, signo=1, acumulados=None):
+    """
+    {idPelicula: incrementos} de varias (idPelicula, resultado, porcentaje) juntas.
+    Con signo=-1 resta (reviews reevaluadas: se resta lo viejo y se suma lo nuevo
+    sobre el mismo `acumulados`).
+    """
+    acumulados = {} if acumulados is None else acumulados
+    for pelicula_id, resultado, porcentaje in reviews:
+        actual = acumulados.setdefault(pelicula_id, {})
+        for columna, n in _incrementos(resultado, porcentaje).items():
+            actual[columna] = actual.get(columna, 0) + signo * n
+    return acumulados
+
+
+def sentencia_incrementar(pelicula_id, incrementos):
+    """UPDATE atómico (columna = columna + n) de la fila de la película."""
+    tabla = models.EstadisticaPelicula
+    return (
+        update(tabla)
+        .where(tabla.idPelicula == pelicula_id)
+        .values({columna: getattr(tabla, columna) + n for columna, n in incrementos.items()})
+    )
+
+
+def sentencia_crear(pelicula_id, incrementos):
+    """Primera fila de una película que no la tenía (creada fuera de crud.create_pelicula)."""
+    return insert(models.EstadisticaPelicula).values(idPelicula=pelicula_id, **incrementos)
+
+
+def sentencia_sumar(pelicula_id, resultado, porcentaje):
+    return sentencia_incrementar(pelicula_id, _incrementos(resultado, porcentaje))
+
+
+def sentencia_insertar(pelicula_id, resultado, porcentaje):
+    return sentencia_crear(pelicula_id, _incrementos(resultado, porcentaje))
+
+
+def consulta_estadisticas(pelicula_id):
+    return select(models.EstadisticaPelicula).where(models.EstadisticaPelicula.idPelicula == pelicula_id)
+
+
+def _contar_resultado(resultado):
+    return func.count(case((models.Review.resultado_review == resultado, 1)))
+
+
+def sentencia_reconstruir():
+    """INSERT ... SELECT con los agregados de todas las películas (las sin reviews quedan en 0)."""
+    review = models.Review
+    agregados = (
+        select(
+            models.Pelicula.idPelicula,
+            func.count(review.idReview),
+            func.coalesce(func.sum(review.porcentaje_review), 0),
+            func.count(review.porcentaje_review),
+            _contar_resultado("POSITIVO"),
+            _contar_resultado("NEGATIVO"),
+            _contar_resultado("NEUTRO"),
+        )
+        .select_from(models.Pelicula)
+        # Sólo las LISTA: las PENDIENTE se suman al completarse y las ERROR nunca
+        .outerjoin(review, (review.numPeliculareview == models.Pelicula.idPelicula)
+                   & (review.estado_review == models.REVIEW_LISTA))
+        .group_by(models.Pelicula.idPelicula)
+    )
+    return insert(models.EstadisticaPelicula).from_select(
+        ["idPelicula", "totalReviews", "sumaPorcentaje", "reviewsConPorcentaje",
+         "reviewsPositivas", "reviewsNegativas", "reviewsNeutras"],
+        agregados,
+    )
+
+
+def reconstruir(db):
+    """Recalcula la tabla completa en una sola transacción (sesión síncrona)."""
+    db.execute(delete(models.EstadisticaPelicula))
+    db.execute(sentencia_reconstruir())
+    db.commit()
+    return db.query(models.EstadisticaPelicula).count()
+
+
+def main():
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        total = reconstruir(db)
+    finally:
+        db.close()
+    print(f"✅ Estadísticas recalculadas para {total} películas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# app/importacion.py
+# Importación masiva de reseñas desde CSV o NDJSON (por ejemplo el
+# "IMDB Dataset.csv" de entrenamiento.py). El archivo se lee en streaming y se
+# procesa por lotes: un predict_proba por lote e idioma, un INSERT multi-fila
+# de reviews y un UPDATE de estadísticas por película, un commit por lote.
+# La memoria queda acotada por IMPORTACION_LOTE, no por el tamaño del archivo.
+#
+#   python -m app.importacion "machine-learning/IMDB Dataset.csv" --pelicula "IMDB"
+#   python -m app.importacion reseñas.ndjson
+import argparse
+import csv
+import json
+import time
+from itertools import islice
+from sqlalchemy import insert, select
+from app import config, estadisticas, models
+from app.ai_service import analizar_sentimientos_lote
+from app.services.traduccion import idioma_local
+
+# Nombres de columna aceptados (el primero presente en el archivo)
+COLUMNAS_TEXTO = ("textReview", "review", "reseña", "texto")
+COLUMNAS_TITULO = ("tituloPelicula", "titulo", "pelicula")
+
+# Usuario al que se asignan las reseñas importadas
+CORREO_IMPORTACION = "importacion@temp.com"
+
+LARGO_TEXTO = models.Review.textReview.type.length
+LARGO_TITULO = models.Pelicula.tituloPelicula.type.length
+
+
+def formato_de(nombre_archivo: str) -> str:
+    return "ndjson" if nombre_archivo.lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def leer_registros(archivo, formato: str = "csv"):
+    """
+    Registros (dict) de un archivo de texto CSV o NDJSON, de a uno. Una línea
+    NDJSON que no es un objeto con valores de texto levanta ValueError con su
+    número de línea.
+    """
+    if formato == "ndjson":
+        for numero, linea in enumerate(archivo, 1):
+            if linea.strip():
+                yield _registro_ndjson(linea, numero)
+    else:
+        yield from csv.DictReader(archivo)
+
+
+def _registro_ndjson(linea: str, numero: int) -> dict:
+    try:
+        registro = json.loads(linea)
+    except ValueError as e:
+        raise ValueError(f"línea {numero}: JSON inválido ({e})") from e
+    if not isinstance(registro, dict):
+        raise ValueError(f"línea {numero}: se esperaba un objeto JSON")
+    for campo, valor in registro.items():
+        if valor is not None and not isinstance(valor, str):
+            raise ValueError(f"línea {numero}: el campo '{campo}' debe ser texto")
+    return registro
+
+
+def _lotes(registros, tamano: int):
+    iterador = iter(registros)
+    while lote := list(islice(iterador, tamano)):
+        yield lote
+
+
+def _columna(registro: dict, candidatas, elegida=None):
+    if elegida:
+        return elegida
+    return next((columna for columna in candidatas if columna in registro), None)
+
+
+def analizar_por_idioma(textos, modelos):
+    """
+    `modelos`: {idioma: (modelo, stop_words)}. Con modelo en español las reseñas
+    en español van a él; el resto, al inglés. No se traduce (demasiado lento
+    para una carga masiva): sin modelo en español, las reseñas en español se
+    puntúan con el modelo en inglés tal cual. Un predict_proba por idioma.
+    """
+    idiomas = ["es" if "es" in modelos and idioma_local(texto) == "es" else "en" for texto in textos]
+    resultados = [None] * len(textos)
+    for idioma in set(idiomas):
+        indices = [i for i, idioma_texto in enumerate(idiomas) if idioma_texto == idioma]
+        for i, resultado in zip(indices, analizar_sentimientos_lote([textos[i] for i in indices], *modelos[idioma])):
+            resultados[i] = resultado
+    return resultados
+
+
+def _usuario_importacion(db, correo: str) -> int:
+    usuario_id = db.execute(select(models.Usuario.idUsuario).where(models.Usuario.correoUsuario == correo)).scalar()
+    if usuario_id is None:
+        usuario = models.Usuario(nombreUsuario="Importación", apellidoUsuario="Masiva", correoUsuario=correo)
+        db.add(usuario)
+        db.commit()
+        usuario_id = usuario.idUsuario
+    return usuario_id
+
+
+def _ids_peliculas(db, titulos, ids: dict) -> int:
+    """Completa `ids` (titulo -> idPelicula) creando las películas que faltan. Devuelve cuántas creó."""
+    faltantes = {titulo for titulo in titulos if titulo not in ids}
+    if not faltantes:
+        return 0
+    columnas = (models.Pelicula.tituloPelicula, models.Pelicula.idPelicula)
+    ids.update(db.execute(select(*columnas).where(models.Pelicula.tituloPelicula.in_(faltantes))).all())
+    nuevas = [titulo for titulo in faltantes if titulo not in ids]
+    if nuevas:
+        db.execute(insert(models.Pelicula), [{"tituloPelicula": titulo} for titulo in nuevas])
+        ids.update(db.execute(select(*columnas).where(models.Pelicula.tituloPelicula.in_(nuevas))).all())
+        db.execute(insert(models.EstadisticaPelicula), [{"idPelicula": ids[titulo]} for titulo in nuevas])
+    return len(nuevas)
+
+
+def importar(
+    db,
+    registros,
+    modelos,
+    tamano_lote: int = 1000,
+    pelicula: str = None,
+    correo: str = CORREO_IMPORTACION,
+    columna_texto: str = None,
+    columna_titulo: str = None
+) -> dict:
+    """
+    Importa `registros` (dicts) como reviews con sesión síncrona. `pelicula` es
+    el título para los registros sin columna de título. Cada lote se confirma
+    por separado: si falla a mitad, los lotes anteriores quedan guardados.
+    """
+    inicio = time.perf_counter()
+    usuario_id = _usuario_importacion(db, correo)
+    ids_peliculas = {}
+    resumen = {"registros": 0, "reviews": 0, "omitidos": 0, "peliculas_creadas": 0, "lotes": 0}
+
+    for lote in _lotes(registros, max(1, tamano_lote)):
+        resumen["registros"] += len(lote)
+        campo_texto = _columna(lote[0], COLUMNAS_TEXTO, columna_texto)
+        campo_titulo = _columna(lote[0], COLUMNAS_TITULO, columna_titulo)
+        filas = []
+        for registro in lote:
+            texto = (registro.get(campo_texto) or "").strip() if campo_texto else ""
+            titulo = (registro.get(campo_titulo) or "").strip() if campo_titulo else ""
+            titulo = (titulo or pelicula or "")[:LARGO_TITULO]
+            if texto and titulo:
+                filas.append((titulo, texto[:LARGO_TEXTO]))
+        resumen["omitidos"] += len(lote) - len(filas)
+        if not filas:
+            continue
+
+        resumen["peliculas_creadas"] += _ids_peliculas(db, {titulo for titulo, _ in filas}, ids_peliculas)
+        resultados = analizar_por_idioma([texto for _, texto in filas], modelos)
+        reviews = [
+            {
+                "textReview": texto,
+                "numPersonaReview": usuario_id,
+                "numPeliculareview": ids_peliculas[titulo],
+                "resultado_review": resultado["resultado"],
+                "porcentaje_review": resultado["porcentaje"],
+                "modelo_version": resultado.get("modelo_version"),
+            }
+            for (titulo, texto), resultado in zip(filas, resultados)
+        ]
+        db.execute(insert(models.Review), reviews)
+        agregados = estadisticas.incrementos_por_pelicula(
+            (review["numPeliculareview"], review["resultado_review"], review["porcentaje_review"]) for review in reviews
+        )
+        for pelicula_id, incrementos in agregados.items():
+            if db.execute(estadisticas.sentencia_incrementar(pelicula_id, incrementos)).rowcount == 0:
+                db.execute(estadisticas.sentencia_crear(pelicula_id, incrementos))
+        db.commit()
+
+        resumen["reviews"] += len(reviews)
+        resumen["lotes"] += 1
+        print(f"📥 {resumen['reviews']} reseñas importadas ({resumen['registros']} registros leídos)")
+
+    resumen["segundos"] = round(time.perf_counter() - inicio, 2)
+    return resumen
+
+
+def main():
+    from app.ai_service import cargar_modelos, cargar_stopwords
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Importa reseñas desde un CSV o NDJSON.")
+    parser.add_argument("archivo")
+    parser.add_argument("--formato", choices=("csv", "ndjson"), help="Por defecto, según la extensión")
+    parser.add_argument("--pelicula", help="Título para los registros sin columna de título")
+    parser.add_argument("--correo", default=CORREO_IMPORTACION, help="Usuario al que se asignan las reseñas")
+    parser.add_argument("--lote", type=int, default=config.IMPORTACION_LOTE)
+    parser.add_argument("--columna-texto")
+    parser.add_argument("--columna-titulo")
+    args = parser.parse_args()
+
+    cargados = cargar_modelos(config.MODELO_FORMATO, ("en", "es") if config.MODELO_ES else ("en",))
+    modelos = {idioma: (modelo, cargar_stopwords(idioma)) for idioma, (_, modelo) in cargados.items()}
+
+    db = SessionLocal()
+    try:
+        with open(args.archivo, encoding="utf-8", newline="") as archivo:
+            resumen = importar(
+                db,
+                leer_registros(archivo, args.formato or formato_de(args.archivo)),
+                modelos,
+                tamano_lote=args.lote,
+                pelicula=args.pelicula,
+                correo=args.correo,
+                columna_texto=args.columna_texto,
+                columna_titulo=args.columna_titulo
+            )
+    finally:
+        db.close()
+    print(f"✅ Importación terminada: {resumen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# app/inferencia.py
+import asyncio
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Awaitable, Callable
+from app.ai_service import analizar_sentimientos_lote, cargar_modelo, cargar_stopwords, idioma_modelo
+
+BACKENDS_INFERENCIA = ("hilo_actual", "hilos", "procesos")
+
+# --- Estado de cada proceso del pool (backend "procesos") ---
+# Cada worker carga los modelos (uno por idioma) UNA vez al arrancar y los reutiliza.
+_modelos_proceso = {}
+
+def _inicializar_proceso(rutas_modelos):
+    for idioma, ruta in rutas_modelos.items():
+        _modelos_proceso[idioma] = (cargar_modelo(ruta, idioma), cargar_stopwords(idioma))
+
+def _analizar_lote_en_proceso(textos, idioma="en"):
+    modelo, stop_words = _modelos_proceso[idioma]
+    return analizar_sentimientos_lote(textos, modelo, stop_words)
+
+
+class BackendInferencia:
+    """
+    Ejecuta analizar_sentimientos_lote en el backend elegido:
+    - "hilo_actual": en el mismo hilo que lo llama (sin pool)
+    - "hilos": en un ThreadPoolExecutor acotado
+    - "procesos": en un ProcessPoolExecutor; cada worker tiene su propia copia
+      del pipeline, así el scoring usa varios cores
+    y lleva la cuenta de los lotes en cola.
+    `rutas_modelos` ({idioma: ruta}) son los modelos que cargan los procesos;
+    cada lote va al modelo del idioma de `modelo`.
+    """
+
+    def __init__(self, tipo: str = "hilos", trabajadores: int = 2, ruta_modelo: str = None,
+                 rutas_modelos: dict = None):
+        if tipo not in BACKENDS_INFERENCIA:
+            raise ValueError(f"Backend de inferencia desconocido: '{tipo}' (opciones: {BACKENDS_INFERENCIA})")
+
+        self.tipo = tipo
+        self.trabajadores = max(trabajadores, 1)
+        self._ejecutor = None
+
+        if tipo == "hilos":
+            self._ejecutor = ThreadPoolExecutor(max_workers=self.trabajadores, thread_name_prefix="inferencia")
+        elif tipo == "procesos":
+            # "spawn": no se forkea un proceso que ya tiene hilos y el modelo cargado
+            self._ejecutor = ProcessPoolExecutor(
+                max_workers=self.trabajadores,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_inicializar_proceso,
+                initargs=(rutas_modelos or {"en": ruta_modelo},)
+            )
+
+        self._lock = threading.Lock()
+        self._en_cola = 0
+        self._max_en_cola = 0
+        self._enviados = 0
+        self._completados = 0
+        self._errores = 0
+
+    def enviar_lote(self, textos, modelo, stop_words) -> Future:
+        """Encola un lote y devuelve un concurrent.futures.Future con la lista de resultados."""
+        with self._lock:
+            self._en_cola += 1
+            self._enviados += 1
+            self._max_en_cola = max(self._max_en_cola, self._en_cola)
+
+        if self.tipo == "hilo_actual":
+            futuro = Future()
+            try:
+                futuro.set_result(analizar_sentimientos_lote(textos, modelo, stop_words))
+            except Exception as e:
+                futuro.set_exception(e)
+        elif self.tipo == "hilos":
+            futuro = self._ejecutor.submit(analizar_sentimientos_lote, textos, modelo, stop_words)
+        else:
+            # El worker usa su propio modelo: no se serializa el pipeline en cada lote
+            futuro = self._ejecutor.submit(_analizar_lote_en_proceso, textos, idioma_modelo(modelo))
+
+        futuro.add_done_callback(self._lote_terminado)
+        return futuro
+
+    def _lote_terminado(self, futuro: Future):
+        with self._lock:
+            self._en_cola -= 1
+            self._completados += 1
+            if futuro.cancelled() or futuro.exception() is not None:
+                self._errores += 1
+
+    async def analizar_lote(self, textos, modelo, stop_words) -> list:
+        if self.tipo != "procesos" or len(textos) <= self.trabajadores:
+            return await asyncio.wrap_future(self.enviar_lote(textos, modelo, stop_words))
+
+        # Lotes grandes: se reparten entre los procesos y se rearman en orden
+        tamano = -(-len(textos) // self.trabajadores)
+        partes = [textos[i:i + tamano] for i in range(0, len(textos), tamano)]
+        resultados = await asyncio.gather(
+            *(asyncio.wrap_future(self.enviar_lote(parte, modelo, stop_words)) for parte in partes)
+        )
+        return [resultado for parte in resultados for resultado in parte]
+
+    def metricas(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.tipo,
+                "trabajadores": self.trabajadores if self._ejecutor is not None else 0,
+                "en_cola": self._en_cola,
+                "max_en_cola": self._max_en_cola,
+                "lotes_enviados": self._enviados,
+                "lotes_completados": self._completados,
+                "errores": self._errores,
+            }
+
+    def cerrar(self, esperar: bool = True):
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=esperar)
+
+
+class MicroLoteador:
+    """
+    Agrupa las llamadas concurrentes a `analizar` durante `espera_ms`
+    (o hasta juntar `max_lote` textos) y las resuelve con una sola llamada
+    a `funcion_lote`, devolviendo a cada request su propio resultado.
+    `funcion_lote` es asíncrona: recibe la lista de textos y devuelve la
+    lista de resultados en el mismo orden.
+    """
+
+    def __init__(
+        self,
+        funcion_lote: Callable[[list], Awaitable[list]],
+        espera_ms: float = 5,
+        max_lote: int = 64
+    ):
+        self._funcion_lote = funcion_lote
+        self._espera = max(espera_ms, 0) / 1000
+        self._max_lote = max(max_lote, 1)
+        self._pendientes = []  # (texto, futuro)
+        self._temporizador = None
+        self._tareas = set()
+
+        # Métricas para ajustar la ventana y el tamaño máximo
+        self._lotes = 0
+        self._textos = 0
+        self._errores = 0
+        self._tamanos = Counter()
+
+    async def analizar(self, texto: str):
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._pendientes.append((texto, futuro))
+
+        if len(self._pendientes) >= self._max_lote:
+            self._despachar()
+        elif self._temporizador is None:
+            self._temporizador = loop.call_later(self._espera, self._despachar)
+
+        return await futuro
+
+    def _despachar(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+
+        lote, self._pendientes = self._pendientes, []
+        if not lote:
+            return
+
+        self._lotes += 1
+        self._textos += len(lote)
+        self._tamanos[len(lote)] += 1
+
+        tarea = asyncio.get_running_loop().create_task(self._ejecutar(lote))
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+
+    async def _ejecutar(self, lote):
+        textos = [texto for texto, _ in lote]
+        try:
+            resultados = await self._funcion_lote(textos)
+        except Exception as e:
+            self._errores += 1
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+
+        for (_, futuro), resultado in zip(lote, resultados):
+            # El request pudo haberse cancelado mientras esperaba
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    def metricas(self) -> dict:
+        return {
+            "espera_ms": self._espera * 1000,
+            "max_lote": self._max_lote,
+            "lotes": self._lotes,
+            "textos": self._textos,
+            "errores": self._errores,
+            "tamano_promedio": self._textos / self._lotes if self._lotes else 0.0,
+            "tamano_maximo": max(self._tamanos) if self._tamanos else 0,
+            "histograma_tamanos": {str(tamano): n for tamano, n in sorted(self._tamanos.items())},
+            "en_espera": len(self._pendientes),
+        }
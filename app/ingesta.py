@@ -0,0 +1,109 @@
+# app/ingesta.py
+# Ingesta asíncrona de reseñas (RESENA_ASINCRONA): /crear-resena/ guarda la
+# reseña como PENDIENTE y responde 202; estos trabajadores la traducen y la
+# analizan en lotes y escriben el resultado. La cola es en memoria, pero la
+# tabla Reviews es la fuente de verdad: al arrancar se vuelven a encolar las
+# PENDIENTE, así que un reinicio no pierde trabajos.
+import asyncio
+from typing import Awaitable, Callable
+from app import crud_async as crud
+from app.database import abrir_sesion_async
+
+
+class ColaResenas:
+    """
+    `analizar(textos)` devuelve un resultado de analizar_sentimiento por texto;
+    `al_completar(review)` se llama por cada reseña escrita (ranking, cachés).
+    Cada trabajador toma hasta `lote_max` reseñas ya encoladas sin esperar más.
+    """
+
+    def __init__(
+        self,
+        analizar: Callable[[list[str]], Awaitable[list[dict]]],
+        al_completar: Callable,
+        trabajadores: int = 1,
+        lote_max: int = 64
+    ):
+        self.analizar = analizar
+        self.al_completar = al_completar
+        self.trabajadores = max(1, trabajadores)
+        self.lote_max = max(1, lote_max)
+        self._cola = asyncio.Queue()
+        self._tareas = []
+        self._procesadas = 0
+        self._errores = 0
+        self._lotes = 0
+
+    def encolar(self, review_id: int, texto: str):
+        self._cola.put_nowait((review_id, texto))
+
+    async def iniciar(self):
+        """Vuelve a encolar las pendientes de la base y arranca los trabajadores."""
+        db = abrir_sesion_async()
+        try:
+            for review_id, texto in await crud.get_reviews_pendientes(db):
+                self.encolar(review_id, texto)
+        finally:
+            await db.close()
+        self._tareas = [asyncio.create_task(self._trabajar()) for _ in range(self.trabajadores)]
+
+    def detener(self):
+        for tarea in self._tareas:
+            tarea.cancel()
+
+    async def _tomar_lote(self):
+        lote = [await self._cola.get()]
+        while len(lote) < self.lote_max and not self._cola.empty():
+            lote.append(self._cola.get_nowait())
+        return lote
+
+    async def _trabajar(self):
+        while True:
+            lote = await self._tomar_lote()
+            try:
+                await self._procesar(lote)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Error procesando {len(lote)} reseña(s) pendientes: {e}")
+                self._errores += len(lote)
+                await self._marcar_error([review_id for review_id, _ in lote])
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+
+    async def _procesar(self, lote):
+        resultados = await self.analizar([texto for _, texto in lote])
+        db = abrir_sesion_async()
+        try:
+            completadas = await crud.completar_reviews(
+                db,
+                [(review_id, resultado["resultado"], resultado["porcentaje"], resultado.get("modelo_version"))
+                 for (review_id, _), resultado in zip(lote, resultados)]
+            )
+        finally:
+            await db.close()
+        self._lotes += 1
+        self._procesadas += len(completadas)
+        for review in completadas:
+            self.al_completar(review)
+
+    async def _marcar_error(self, review_ids):
+        try:
+            db = abrir_sesion_async()
+            try:
+                await crud.marcar_reviews_error(db, review_ids)
+            finally:
+                await db.close()
+        except Exception as e:
+            print(f"⚠️ No se pudo marcar el error de las reseñas {review_ids}: {e}")
+
+    def metricas(self) -> dict:
+        return {
+            "en_cola": self._cola.qsize(),
+            "trabajadores": self.trabajadores,
+            "procesadas": self._procesadas,
+            "errores": self._errores,
+            "lotes": self._lotes,
+            "lote_promedio": self._procesadas / self._lotes if self._lotes else 0.0,
+        }
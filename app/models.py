@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Double, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 
+# Estados de Review.estado_review: PENDIENTE = guardada sin analizar (ingesta
+# asíncrona, app/ingesta.py); LISTA = analizada; ERROR = falló el análisis
+REVIEW_PENDIENTE, REVIEW_LISTA, REVIEW_ERROR = "PENDIENTE", "LISTA", "ERROR"
+
 class Usuario(Base):
     __tablename__ = "Usuarios"
     idUsuario = Column(Integer, primary_key=True, index=True)
@@ -23,6 +27,7 @@ class Pelicula(Base):
     poster_url = Column(String(255))
     
     reviews = relationship("Review", back_populates="pelicula")
+    estadisticas = relationship("EstadisticaPelicula", uselist=False, back_populates="pelicula")
 
 class Review(Base):
     __tablename__ = "Reviews"
@@ -33,7 +38,42 @@ class Review(Base):
     textReview = Column(String(1000))
 
     resultado_review = Column(String(20))  # POSITIVO / NEGATIVO / NEUTRO
-    porcentaje_review = Column(Integer)    # o Double si querés decimal
+    porcentaje_review = Column(Double)     # probabilidad de positividad (0-1)
+    modelo_version = Column(String(100))   # versión del modelo que la analizó (None: reglas o manual)
+    estado_review = Column(String(20), nullable=False, default=REVIEW_LISTA, server_default=REVIEW_LISTA)
 
     usuario = relationship("Usuario", back_populates="reviews")
     pelicula = relationship("Pelicula", back_populates="reviews")
+
+    # Consultas por película (promedio y listado por idReview) y por usuario
+    # (migración alembic/versions/0002_indices_reviews.py)
+    __table_args__ = (
+        Index("ix_reviews_pelicula_porcentaje", "numPeliculareview", "porcentaje_review"),
+        Index("ix_reviews_pelicula_review", "numPeliculareview", "idReview"),
+        Index("ix_reviews_usuario_review", "numPersonaReview", "idReview"),
+        Index("ix_reviews_estado", "estado_review"),  # pendientes a re-encolar al arrancar (0004)
+    )
+
+
+class EstadisticaPelicula(Base):
+    """
+    Agregados de las reviews de cada película, mantenidos en la misma
+    transacción que crud.create_review (ver app/estadisticas.py). La valoración
+    se lee de acá en lugar de un AVG() sobre todas las reviews.
+    """
+    __tablename__ = "EstadisticasPeliculas"
+
+    idPelicula = Column(Integer, ForeignKey("Peliculas.idPelicula"), primary_key=True)
+    totalReviews = Column(Integer, nullable=False, default=0, server_default="0")
+    sumaPorcentaje = Column(Double, nullable=False, default=0, server_default="0")
+    reviewsConPorcentaje = Column(Integer, nullable=False, default=0, server_default="0")
+    reviewsPositivas = Column(Integer, nullable=False, default=0, server_default="0")
+    reviewsNegativas = Column(Integer, nullable=False, default=0, server_default="0")
+    reviewsNeutras = Column(Integer, nullable=False, default=0, server_default="0")
+
+    pelicula = relationship("Pelicula", back_populates="estadisticas")
+
+    @property
+    def valoracion(self):
+        """Promedio de porcentaje_review (ignora los NULL; None si no hay ninguno, igual que AVG)."""
+        return self.sumaPorcentaje / self.reviewsConPorcentaje if self.reviewsConPorcentaje else None
@@ -0,0 +1,34 @@
+# app/paginacion.py
+# Paginación por cursor (keyset): cada página sigue al último id de la anterior
+# (`WHERE id > :ultimo ORDER BY id LIMIT n`), así una página profunda cuesta lo
+# mismo que la primera. El cursor es opaco para el cliente.
+import base64
+import json
+from typing import Optional
+from app import config
+
+def limitar(limit: int) -> int:
+    """Tamaño de página entre 1 y PAGINA_TAMANO_MAX."""
+    return max(1, min(limit, config.PAGINA_TAMANO_MAX))
+
+def codificar_cursor(ultimo_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": ultimo_id}).encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Id después del cual empieza la página; ValueError si el cursor no es válido."""
+    if not cursor:
+        return None
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        ultimo_id = datos["id"]
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(ultimo_id, int):
+        raise ValueError("Cursor inválido")
+    return ultimo_id
+
+def siguiente_cursor(items, limit: int, campo_id: str) -> Optional[str]:
+    """Cursor de la página siguiente, o None si esta página no se llenó (no hay más)."""
+    if len(items) < limit:
+        return None
+    return codificar_cursor(getattr(items[-1], campo_id))
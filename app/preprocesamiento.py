@@ -0,0 +1,141 @@
+# app/preprocesamiento.py
+# Preprocesamiento compartido entre la API (app/ai_service.py) y el
+# entrenamiento (machine-learning/entrenamiento.py).
+# Los regex se compilan una vez al importar. El de la API es UNA pasada en
+# lugar de una cadena de re.sub, y el filtro de stopwords y la detección de
+# palabras de sentimiento se hacen en el mismo recorrido de tokens.
+import re
+
+# Palabras que disparan las reglas de negación / positividad
+PALABRAS_NEGATIVAS = frozenset({
+    'not', 'no', 'never',
+    'hate', 'hated', 'hating', 'terrible', 'awful', 'horrible', 'boring', 'bored',
+    'dislike', 'disliked', 'worst', 'bad', 'waste', 'rubbish', 'garbage', 'stupid',
+    'dumb', 'sucks', 'sucked'
+})
+
+PALABRAS_POSITIVAS = frozenset({
+    'love', 'loved', 'loving', 'great', 'amazing', 'awesome', 'fantastic', 'excellent',
+    'wonderful', 'brilliant', 'perfect', 'best', 'enjoyed', 'enjoy', 'fun', 'funny'
+})
+
+# Marcas de negación que deja el preprocesado ("did_not", "_no_", "_never_")
+_MARCAS_NEGACION = ('_no', '_never')  # '_no' también cubre '_not'
+
+# --- Servicio: une negaciones a la palabra, conserva ! ? y _ ---
+# El orden de las alternativas reproduce el de los re.sub originales:
+# won't -> will_not, can't -> can_not, n't -> _not, not/no/never -> _x_,
+# y todo lo que no sea letra, espacio, ! ? o _ pasa a ser un espacio.
+_REGEX_SERVICIO = re.compile(
+    r"(?P<wont>won't)|(?P<cant>can't)|(?P<nt>n't)|\b(?P<neg>not|no|never)\b|(?P<otro>[^a-z\s!?_]+)"
+)
+_REEMPLAZOS_SERVICIO = {'wont': 'will_not', 'cant': 'can_not', 'nt': '_not', 'otro': ' '}
+
+def _reemplazo_servicio(match):
+    grupo = match.lastgroup
+    if grupo == 'neg':
+        return f"_{match.group(grupo)}_"
+    return _REEMPLAZOS_SERVICIO[grupo]
+
+_SIGNOS = re.compile(r'[!?]')
+
+def preprocesar(texto, stop_words):
+    """
+    Devuelve (texto_procesado, tiene_negacion, tiene_positivo).
+    texto_procesado es idéntico al del antiguo preprocesar_texto_mejorado y
+    los flags equivalen a los patrones_negativos / patrones_positivos.
+    """
+    texto = _REGEX_SERVICIO.sub(_reemplazo_servicio, texto.lower().strip())
+
+    palabras = []
+    tiene_negacion = False
+    tiene_positivo = False
+    for palabra in texto.split():
+        # Mantener palabras con guiones bajos (negaciones) y palabras importantes
+        if '_' in palabra:
+            if not tiene_negacion and any(marca in palabra for marca in _MARCAS_NEGACION):
+                tiene_negacion = True
+        elif palabra in stop_words:
+            continue
+        palabras.append(palabra)
+
+        # "great!" o "bad?!" también cuentan: se mira cada tramo entre signos
+        tramos = _SIGNOS.split(palabra) if ('!' in palabra or '?' in palabra) else (palabra,)
+        for tramo in tramos:
+            if tramo in PALABRAS_NEGATIVAS:
+                tiene_negacion = True
+            elif tramo in PALABRAS_POSITIVAS:
+                tiene_positivo = True
+
+    return ' '.join(palabras), tiene_negacion, tiene_positivo
+
+# --- Entrenamiento: quita <br>, elimina todo lo no alfabético ---
+# Aquí no conviene un callback por match (la mayoría son signos de puntuación):
+# dos sub compilados con reemplazo fijo, y el de <br> sólo si hace falta.
+_REGEX_BR = re.compile(r'<br\s*/?>')
+_REGEX_NO_ALFABETICO = re.compile(r'[^a-z\s]')
+
+def normalizar_para_entrenamiento(texto, stop_words):
+    """Limpia y normaliza el texto de las reseñas del dataset (formato histórico del entrenamiento)."""
+    if not isinstance(texto, str):
+        return ""
+    texto = texto.lower()
+    if '<br' in texto:
+        texto = _REGEX_BR.sub(' ', texto)  # Eliminar HTML
+    texto = _REGEX_NO_ALFABETICO.sub('', texto)  # Eliminar no-alfabéticos
+    return ' '.join([palabra for palabra in texto.split() if palabra not in stop_words])
+
+# --- Servicio en español (modelo nativo, sin traducir) ---
+# Mismo formato de salida que `preprocesar`: negaciones marcadas como _no_,
+# _nunca_, ... y el resto de lo que no sea letra (con tildes y ñ), espacio,
+# ! ? o _ pasa a ser un espacio.
+PALABRAS_NEGATIVAS_ES = frozenset({
+    'no', 'nunca', 'jamás', 'jamas', 'ni', 'tampoco',
+    'malo', 'mala', 'malísima', 'malisima', 'pésima', 'pesima', 'pésimo', 'pesimo',
+    'aburrida', 'aburrido', 'horrible', 'terrible', 'odié', 'odie', 'odio', 'peor',
+    'basura', 'desastre', 'decepcionante', 'decepción', 'decepcion', 'absurda', 'fatal'
+})
+
+PALABRAS_POSITIVAS_ES = frozenset({
+    'buena', 'bueno', 'buenísima', 'buenisima', 'excelente', 'genial', 'increíble',
+    'increible', 'encantó', 'encanto', 'maravillosa', 'maravilla', 'divertida',
+    'hermosa', 'mejor', 'recomiendo', 'perfecta', 'fantástica', 'fantastica', 'brillante'
+})
+
+_MARCAS_NEGACION_ES = ('_no_', '_nunca_', '_jamás_', '_jamas_', '_ni_', '_tampoco_')
+
+_REGEX_SERVICIO_ES = re.compile(
+    r"\b(?P<neg>no|nunca|jamás|jamas|ni|tampoco)\b|(?P<otro>[^a-záéíóúüñ\s!?_]+)"
+)
+
+def _reemplazo_servicio_es(match):
+    if match.lastgroup == 'neg':
+        return f"_{match.group('neg')}_"
+    return ' '
+
+def preprocesar_es(texto, stop_words):
+    """Como `preprocesar`, para reseñas en español. Devuelve (texto_procesado, tiene_negacion, tiene_positivo)."""
+    texto = _REGEX_SERVICIO_ES.sub(_reemplazo_servicio_es, texto.lower().strip())
+
+    palabras = []
+    tiene_negacion = False
+    tiene_positivo = False
+    for palabra in texto.split():
+        if '_' in palabra:
+            if not tiene_negacion and any(marca in palabra for marca in _MARCAS_NEGACION_ES):
+                tiene_negacion = True
+        elif palabra in stop_words:
+            continue
+        palabras.append(palabra)
+
+        tramos = _SIGNOS.split(palabra) if ('!' in palabra or '?' in palabra) else (palabra,)
+        for tramo in tramos:
+            if tramo in PALABRAS_NEGATIVAS_ES:
+                tiene_negacion = True
+            elif tramo in PALABRAS_POSITIVAS_ES:
+                tiene_positivo = True
+
+    return ' '.join(palabras), tiene_negacion, tiene_positivo
+
+# Preprocesador de la API según el idioma del modelo
+PREPROCESADORES = {'en': preprocesar, 'es': preprocesar_es}
@@ -0,0 +1,71 @@
+# app/ranking.py
+# Ranking de películas en memoria para GET /peliculas/ranking. Se arma al
+# arrancar desde EstadisticasPeliculas y cada review nueva lo actualiza en
+# O(log n) + un corrimiento de la lista, sin consultar la base.
+import bisect
+import threading
+
+CRITERIOS = ("puntaje", "reviews")
+
+
+class RankingPeliculas:
+    """
+    Dos listas ordenadas de (-clave, idPelicula): por puntaje bayesiano de
+    positividad y por cantidad de reviews. Sólo entran películas con reviews.
+
+    puntaje = (positivas + peso_previo * media) / (total + peso_previo)
+
+    `media` es la proporción global de reviews positivas (0.5 sin datos). Se
+    fija en cada carga (no con cada review) para que una review sólo mueva a
+    su película.
+    """
+
+    MEDIA_SIN_DATOS = 0.5
+
+    def __init__(self, peso_previo: float):
+        self.peso_previo = peso_previo
+        self._lock = threading.Lock()
+        self._estadisticas = {}  # idPelicula -> (total, positivas)
+        self._por_puntaje = []
+        self._por_reviews = []
+        self._media = self.MEDIA_SIN_DATOS
+
+    def _puntaje(self, total, positivas):
+        return (positivas + self.peso_previo * self._media) / (total + self.peso_previo)
+
+    def _claves(self, pelicula_id, total, positivas):
+        return (-self._puntaje(total, positivas), pelicula_id), (-total, pelicula_id)
+
+    def cargar(self, filas):
+        """Reemplaza el ranking con filas (idPelicula, totalReviews, reviewsPositivas)."""
+        estadisticas = {pelicula_id: (total, positivas) for pelicula_id, total, positivas in filas if total}
+        total_reviews = sum(total for total, _ in estadisticas.values())
+        with self._lock:
+            self._media = sum(p for _, p in estadisticas.values()) / total_reviews if total_reviews else self.MEDIA_SIN_DATOS
+            self._estadisticas = estadisticas
+            claves = [self._claves(pelicula_id, *valores) for pelicula_id, valores in estadisticas.items()]
+            self._por_puntaje = sorted(puntaje for puntaje, _ in claves)
+            self._por_reviews = sorted(reviews for _, reviews in claves)
+
+    def registrar(self, pelicula_id, resultado):
+        """Suma una review nueva de la película (después del commit)."""
+        with self._lock:
+            anterior = self._estadisticas.get(pelicula_id)
+            if anterior:
+                for lista, clave in zip((self._por_puntaje, self._por_reviews), self._claves(pelicula_id, *anterior)):
+                    del lista[bisect.bisect_left(lista, clave)]
+            total, positivas = anterior or (0, 0)
+            nuevo = (total + 1, positivas + (resultado == "POSITIVO"))
+            self._estadisticas[pelicula_id] = nuevo
+            for lista, clave in zip((self._por_puntaje, self._por_reviews), self._claves(pelicula_id, *nuevo)):
+                bisect.insort(lista, clave)
+
+    def top(self, criterio="puntaje", n=10):
+        """[(idPelicula, puntaje, total, positivas)] de las n primeras según `criterio`."""
+        with self._lock:
+            lista = self._por_puntaje if criterio == "puntaje" else self._por_reviews
+            resultado = []
+            for _, pelicula_id in lista[:n]:
+                total, positivas = self._estadisticas[pelicula_id]
+                resultado.append((pelicula_id, self._puntaje(total, positivas), total, positivas))
+            return resultado
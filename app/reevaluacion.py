@@ -0,0 +1,197 @@
+# app/reevaluacion.py
+# Vuelve a analizar las reviews guardadas con el modelo actual (después de
+# reentrenar o cambiar sentimiento_pipeline.pkl). Recorre Reviews por idReview
+# en lotes, un predict_proba por lote e idioma, un UPDATE masivo por clave
+# primaria y el ajuste de EstadisticasPeliculas en la misma transacción.
+#
+#   python -m app.reevaluacion                # sigue desde el último lote confirmado
+#   python -m app.reevaluacion --reiniciar    # desde el principio
+#
+# Sólo toca las reviews LISTA cuyo modelo_version no es el del modelo actual
+# (o es NULL). El progreso se guarda en REEVALUACION_PROGRESO después de cada
+# commit: si se corta, la próxima corrida sigue desde ahí. Sin modelo en español
+# las reseñas en español se traducen como en /crear-resena/ (con la caché de
+# traducciones); las que no se pueden traducir quedan como estaban.
+import argparse
+import json
+import os
+import time
+from sqlalchemy import or_, select, update
+from app import config, estadisticas, models
+from app.ai_service import obtener_version_modelo
+from app.importacion import analizar_por_idioma
+from app.services.traduccion import idioma_local
+
+
+def leer_progreso(ruta: str, versiones) -> int:
+    """Último idReview procesado con estas `versiones` (0 si no hay progreso o cambió el modelo)."""
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            progreso = json.load(archivo)
+    except (OSError, ValueError):
+        return 0
+    if progreso.get("versiones") != sorted(versiones):
+        return 0
+    return int(progreso.get("ultimo_id", 0))
+
+
+def guardar_progreso(ruta: str, versiones, ultimo_id: int):
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump({"versiones": sorted(versiones), "ultimo_id": ultimo_id}, archivo)
+    os.replace(temporal, ruta)
+
+
+def consulta_desactualizadas(versiones, despues_de: int, limite: int):
+    review = models.Review
+    return (
+        select(
+            review.idReview, review.textReview, review.numPeliculareview,
+            review.resultado_review, review.porcentaje_review,
+        )
+        .where(
+            review.idReview > despues_de,
+            review.estado_review == models.REVIEW_LISTA,
+            or_(review.modelo_version.is_(None), review.modelo_version.not_in(versiones)),
+        )
+        .order_by(review.idReview)
+        .limit(limite)
+    )
+
+
+def _textos_para_modelo(filas, modelos, traductor):
+    """
+    (filas, textos) que se pueden reevaluar. Sin modelo en español, las reseñas
+    en español se traducen al inglés; si no hay traductor o la traducción falla
+    se omiten: el modelo en inglés las puntuaría peor que cuando se crearon.
+    """
+    textos = [fila.textReview or "" for fila in filas]
+    if "es" in modelos:
+        return list(filas), textos
+    indices_es = [i for i, texto in enumerate(textos) if idioma_local(texto) == "es"]
+    if not indices_es:
+        return list(filas), textos
+    try:
+        if traductor is None:
+            raise RuntimeError("no hay traductor")
+        for i, traduccion in zip(indices_es, traductor.traducir_lote([textos[i] for i in indices_es], src="es", dest="en")):
+            textos[i] = traduccion
+    except Exception as e:
+        print(f"⚠️ Se omiten {len(indices_es)} reseña(s) en español sin traducir: {e}")
+        omitidas = set(indices_es)
+        return (
+            [fila for i, fila in enumerate(filas) if i not in omitidas],
+            [texto for i, texto in enumerate(textos) if i not in omitidas],
+        )
+    return list(filas), textos
+
+
+def _deltas(filas, resultados):
+    """Incrementos por película sin los que quedan en cero (review con el mismo resultado)."""
+    deltas = estadisticas.incrementos_por_pelicula(
+        ((fila.numPeliculareview, resultado["resultado"], resultado["porcentaje"])
+         for fila, resultado in zip(filas, resultados))
+    )
+    estadisticas.incrementos_por_pelicula(
+        ((fila.numPeliculareview, fila.resultado_review, fila.porcentaje_review) for fila in filas),
+        signo=-1,
+        acumulados=deltas,
+    )
+    return {
+        pelicula_id: cambios
+        for pelicula_id, incrementos in deltas.items()
+        if (cambios := {columna: n for columna, n in incrementos.items() if n})
+    }
+
+
+def reevaluar(db, modelos, tamano_lote: int = 1000, desde: int = 0, ruta_progreso: str = None, traductor=None) -> dict:
+    """
+    Reevalúa con sesión síncrona las reviews desactualizadas con idReview > `desde`.
+    Cada lote se confirma por separado y, con `ruta_progreso`, se anota hasta
+    dónde se llegó. `traductor` (ServicioTraduccion) traduce las reseñas en
+    español cuando no hay modelo en español; sin él, esas reseñas se omiten.
+
+    Los lotes se leen por rango de clave (idReview > último) en lugar de un
+    cursor abierto durante toda la corrida: cada lectura es corta, no retiene un
+    snapshot de horas en MySQL ni bloquea las escrituras en SQLite.
+    """
+    inicio = time.perf_counter()
+    versiones = sorted({obtener_version_modelo(modelo) for modelo, _ in modelos.values()})
+    resumen = {"reviews": 0, "cambiadas": 0, "omitidas": 0, "lotes": 0, "ultimo_id": desde}
+
+    while leidas := db.execute(consulta_desactualizadas(versiones, resumen["ultimo_id"], max(1, tamano_lote))).all():
+        resumen["ultimo_id"] = leidas[-1].idReview
+        filas, textos = _textos_para_modelo(leidas, modelos, traductor)
+        resumen["omitidas"] += len(leidas) - len(filas)
+        if not filas:
+            continue
+        resultados = analizar_por_idioma(textos, modelos)
+        db.execute(update(models.Review), [
+            {
+                "idReview": fila.idReview,
+                "resultado_review": resultado["resultado"],
+                "porcentaje_review": resultado["porcentaje"],
+                "modelo_version": resultado.get("modelo_version"),
+            }
+            for fila, resultado in zip(filas, resultados)
+        ])
+        for pelicula_id, incrementos in _deltas(filas, resultados).items():
+            db.execute(estadisticas.sentencia_incrementar(pelicula_id, incrementos))
+        db.commit()
+
+        resumen["reviews"] += len(filas)
+        resumen["cambiadas"] += sum(
+            fila.resultado_review != resultado["resultado"] for fila, resultado in zip(filas, resultados)
+        )
+        resumen["lotes"] += 1
+        if ruta_progreso:
+            guardar_progreso(ruta_progreso, versiones, resumen["ultimo_id"])
+        print(f"🔁 {resumen['reviews']} reseñas reevaluadas ({resumen['cambiadas']} cambiaron), hasta idReview {resumen['ultimo_id']}")
+
+    resumen["segundos"] = round(time.perf_counter() - inicio, 2)
+    return resumen
+
+
+def main():
+    from app.ai_service import cargar_modelos, cargar_stopwords
+    from app.database import SessionLocal
+    from app.services.traduccion import ClienteGoogletrans, ServicioTraduccion
+
+    parser = argparse.ArgumentParser(description="Vuelve a analizar las reseñas con el modelo actual.")
+    parser.add_argument("--lote", type=int, default=config.REEVALUACION_LOTE)
+    parser.add_argument("--desde", type=int, help="Empezar después de este idReview (ignora el progreso guardado)")
+    parser.add_argument("--reiniciar", action="store_true", help="Empezar desde el principio")
+    parser.add_argument("--progreso", default=config.REEVALUACION_PROGRESO, help="Archivo de progreso")
+    args = parser.parse_args()
+
+    cargados = cargar_modelos(config.MODELO_FORMATO, ("en", "es") if config.MODELO_ES else ("en",))
+    modelos = {idioma: (modelo, cargar_stopwords(idioma)) for idioma, (_, modelo) in cargados.items()}
+    versiones = {obtener_version_modelo(modelo) for modelo, _ in modelos.values()}
+
+    if args.desde is not None:
+        desde = args.desde
+    else:
+        desde = 0 if args.reiniciar else leer_progreso(args.progreso, versiones)
+    if desde:
+        print(f"↪️ Continuando después de idReview {desde}")
+
+    traductor = None
+    if "es" not in modelos:
+        traductor = ServicioTraduccion(
+            ClienteGoogletrans(),
+            ruta_cache=config.TRADUCCION_CACHE_RUTA,
+            max_caracteres=config.TRADUCCION_MAX_CARACTERES
+        )
+
+    db = SessionLocal()
+    try:
+        resumen = reevaluar(
+            db, modelos, tamano_lote=args.lote, desde=desde, ruta_progreso=args.progreso, traductor=traductor
+        )
+    finally:
+        db.close()
+    print(f"✅ Reevaluación terminada: {resumen}")
+
+
+if __name__ == "__main__":
+    main()
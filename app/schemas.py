@@ -36,6 +36,11 @@ class Pelicula(PeliculaBase):
     class Config:
         orm_mode = True
 
+class PeliculaRanking(Pelicula):
+    puntaje: float          # positividad bayesiana (0 a 1)
+    totalReviews: int
+    reviewsPositivas: int
+
 # Schemas para Review
 class ReviewBase(BaseModel):
     textReview: str
@@ -43,6 +48,7 @@ class ReviewBase(BaseModel):
     numPeliculareview: int
     resultado_review: Optional[str] = None
     porcentaje_review: Optional[float] = None
+    modelo_version: Optional[str] = None
 
 
 class ReviewCreate(ReviewBase):
@@ -50,10 +56,24 @@ class ReviewCreate(ReviewBase):
 
 class Review(ReviewBase):
     idReview: int
+    estado_review: Optional[str] = None  # PENDIENTE / LISTA / ERROR
 
     class Config:
         orm_mode = True
 
+class DetallePelicula(BaseModel):
+    pelicula: Pelicula
+    resena: list[Review]                # página de reviews (X-Next-Cursor si hay más)
+    valoracion: Optional[float] = None  # promedio de porcentaje_review
+    totalReviews: int = 0
+
+class EstadoReview(BaseModel):
+    idReview: int
+    estado: str                         # PENDIENTE / LISTA / ERROR
+    resultado_review: Optional[str] = None
+    porcentaje_review: Optional[float] = None
+    en_cola: int = 0                    # reseñas esperando en este proceso
+
 # Schema para Review con relaciones
 class ReviewWithRelations(Review):
     usuario: Usuario
@@ -74,3 +94,22 @@ class ResultadoReview(BaseModel):
 
     class Config:
         orm_mode = True
+
+# Schemas para análisis de sentimiento por lote
+class AnalisisLote(BaseModel):
+    textos: list[str]
+    traducir: bool = False  # True: las reseñas en español se traducen (todas juntas) antes de analizar
+
+class ResultadoAnalisis(BaseModel):
+    resultado: str
+    porcentaje: float
+    texto_procesado: str
+    emoji: str
+    confianza: float
+    traduccion_realizada: bool = False
+    modelo_idioma: str = "en"
+    modelo_version: Optional[str] = None
+
+class ResultadoAnalisisLote(BaseModel):
+    total: int
+    resultados: list[ResultadoAnalisis]
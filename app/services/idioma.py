@@ -0,0 +1,74 @@
+import re
+
+# Detección de idioma local (sin red) por perfiles de palabras frecuentes.
+# Sólo distingue inglés de español, que es lo que la API necesita para decidir
+# si traducir. Las palabras que existen en ambos idiomas ("no", "me", "a", ...)
+# no están en ningún perfil.
+
+PALABRAS_ES = frozenset({
+    'de', 'la', 'que', 'el', 'en', 'y', 'los', 'del', 'se', 'las', 'por', 'un', 'para',
+    'con', 'una', 'su', 'al', 'lo', 'como', 'más', 'mas', 'pero', 'sus', 'le', 'ya', 'este',
+    'sí', 'porque', 'esta', 'entre', 'cuando', 'muy', 'sin', 'sobre', 'también', 'tambien',
+    'hasta', 'hay', 'donde', 'quien', 'desde', 'todo', 'nos', 'durante', 'todos', 'uno',
+    'les', 'ni', 'contra', 'otros', 'ese', 'eso', 'ante', 'ellos', 'esto', 'mí', 'antes',
+    'algunos', 'qué', 'unos', 'yo', 'otro', 'otras', 'otra', 'él', 'tanto', 'esa', 'estos',
+    'mucho', 'nada', 'muchos', 'cual', 'poco', 'ella', 'estar', 'estas', 'algo', 'nosotros',
+    'mi', 'mis', 'tú', 'te', 'ti', 'tu', 'es', 'fue', 'ser', 'está', 'estaba',
+    'fueron', 'tiene', 'tenía', 'hace', 'puede', 'creo', 'bien', 'mal', 'nunca', 'siempre',
+    # Vocabulario típico de reseñas
+    'película', 'pelicula', 'películas', 'peliculas', 'peli', 'actuación', 'actuacion',
+    'actores', 'trama', 'historia', 'buena', 'bueno', 'buenísima', 'mala', 'malo',
+    'excelente', 'aburrida', 'aburrido', 'genial', 'gustó', 'gusto', 'encantó', 'encanto',
+    'recomiendo', 'peor', 'mejor', 'odié', 'odie', 'vale', 'pena', 'tiempo', 'increíble',
+    'increible', 'hermosa', 'divertida', 'lenta', 'guion', 'guión',
+})
+
+PALABRAS_EN = frozenset({
+    'the', 'of', 'and', 'to', 'in', 'is', 'it', 'that', 'was', 'for', 'on', 'are', 'with',
+    'as', 'his', 'they', 'be', 'at', 'one', 'have', 'this', 'from', 'or', 'had', 'by',
+    'but', 'what', 'some', 'we', 'can', 'out', 'other', 'were', 'all', 'there', 'when',
+    'up', 'use', 'your', 'how', 'an', 'each', 'she', 'which', 'do', 'their', 'if', 'will',
+    'way', 'about', 'many', 'then', 'them', 'would', 'so', 'these', 'her', 'see', 'him',
+    'has', 'more', 'could', 'go', 'did', 'my', 'than', 'been', 'who', 'its', 'now', 'not',
+    'very', 'just', 'really', 'too', 'i', 'you', "didn't", "don't", "it's", "isn't",
+    'never', 'ever', 'much', 'even', 'only', 'after', 'good', 'bad', 'well',
+    # Vocabulario típico de reseñas
+    'movie', 'movies', 'film', 'films', 'acting', 'actors', 'plot', 'story', 'ending',
+    'great', 'awful', 'boring', 'loved', 'love', 'hated', 'hate', 'liked', 'like', 'best',
+    'worst', 'amazing', 'terrible', 'waste', 'watch', 'watched', 'funny', 'enjoyed',
+    'recommend', 'script', 'scenes', 'characters',
+})
+
+# Caracteres que en la práctica sólo aparecen en español
+_CARACTERES_ES = frozenset('ñáéíóúü¿¡')
+
+_TOKENS = re.compile(r"[a-záéíóúüñ']+")
+
+
+def detectar_idioma(texto: str):
+    """
+    Devuelve (idioma, confianza) con idioma "en", "es" o None si no hay
+    evidencia suficiente. La confianza es la fracción de evidencia a favor
+    del idioma elegido (0.5 = empate, 1.0 = sin evidencia en contra).
+    """
+    texto = texto.lower()
+    puntos_es = 0.0
+    puntos_en = 0.0
+
+    for token in _TOKENS.findall(texto):
+        if token in PALABRAS_ES:
+            puntos_es += 1
+        elif token in PALABRAS_EN:
+            puntos_en += 1
+
+    # Cada carácter propio del español suma un punto (máximo 3)
+    puntos_es += min(sum(1 for c in texto if c in _CARACTERES_ES), 3)
+
+    total = puntos_es + puntos_en
+    if total < 1:
+        return None, 0.0
+    if puntos_es > puntos_en:
+        return "es", puntos_es / total
+    if puntos_en > puntos_es:
+        return "en", puntos_en / total
+    return None, 0.5
@@ -0,0 +1,371 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from app import config
+from app.services.idioma import detectar_idioma
+
+# Hilos dedicados a la traducción: una llamada colgada a Google
+# no le quita hilos al resto de la aplicación.
+_ejecutor_traduccion = ThreadPoolExecutor(
+    max_workers=config.TRADUCCION_HILOS,
+    thread_name_prefix="traduccion"
+)
+
+# --- Clientes de traducción ---
+
+class ClienteGoogletrans:
+    """
+    Un googletrans.Translator reutilizado (su cliente HTTP mantiene la conexión
+    abierta). En googletrans >= 4.0.1 ese cliente es asíncrono y queda atado al
+    event loop donde se usó primero: fuera de ese loop (asyncio.run de los
+    procesos por lote) se usa otro Translator, uno por loop.
+    """
+
+    def __init__(self, translator=None):
+        if translator is None:
+            from googletrans import Translator
+            translator = Translator()
+        self.translator = translator
+        # googletrans >= 4.0.1 expone detect/translate como corrutinas
+        self.asincrono = inspect.iscoroutinefunction(translator.translate)
+        self._por_loop = weakref.WeakKeyDictionary()
+        self._loop_original = None
+
+    def _translator_del_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop_original is None:
+            self._loop_original = weakref.ref(loop)
+        if self._loop_original() is loop:
+            return self.translator
+        translator = self._por_loop.get(loop)
+        if translator is None:
+            translator = self._por_loop[loop] = type(self.translator)()
+        return translator
+
+    def traducir(self, texto, src, dest):
+        return self.translator.translate(texto, src=src, dest=dest).text
+
+    async def traducir_async(self, texto, src, dest):
+        return (await self._translator_del_loop().translate(texto, src=src, dest=dest)).text
+
+    def detectar(self, texto):
+        return self.translator.detect(texto).lang
+
+    async def detectar_async(self, texto):
+        return (await self._translator_del_loop().detect(texto)).lang
+
+
+class ClienteDeepTranslator:
+    """deep_translator.GoogleTranslator: una instancia por par de idiomas, no una por reseña."""
+
+    asincrono = False
+
+    def __init__(self, timeout=5):
+        from deep_translator import GoogleTranslator
+        self._clase = GoogleTranslator
+        self._timeout = timeout
+        self._instancias = {}
+
+    def traducir(self, texto, src, dest):
+        instancia = self._instancias.get((src, dest))
+        if instancia is None:
+            instancia = self._instancias[(src, dest)] = self._clase(source=src, target=dest)
+        return instancia.translate(text=texto, timeout=self._timeout)
+
+
+# --- Almacén persistente ---
+
+class CacheTraducciones:
+    """
+    Traducciones ya hechas en un SQLite local, por (hash del texto, src, dest).
+    Sobrevive a reinicios y la comparten todos los workers de la máquina (WAL).
+    """
+
+    def __init__(self, ruta):
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False, timeout=5)
+        with self._lock, self._conexion:
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS traducciones ("
+                " clave TEXT PRIMARY KEY, src TEXT, dest TEXT, traduccion TEXT, creada REAL)"
+            )
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(texto, src, dest):
+        return hashlib.sha256(f"{src}\x00{dest}\x00{texto}".encode('utf-8')).hexdigest()
+
+    def obtener(self, claves):
+        """Devuelve {clave: traduccion} para las claves guardadas."""
+        encontradas = {}
+        claves = list(claves)
+        with self._lock:
+            # De a 500 para no pasar el límite de parámetros de SQLite
+            for i in range(0, len(claves), 500):
+                parte = claves[i:i + 500]
+                filas = self._conexion.execute(
+                    f"SELECT clave, traduccion FROM traducciones WHERE clave IN ({','.join('?' * len(parte))})",
+                    parte
+                ).fetchall()
+                encontradas.update(filas)
+            self.aciertos += len(encontradas)
+            self.fallos += len(claves) - len(encontradas)
+        return encontradas
+
+    def guardar(self, filas):
+        """`filas`: lista de (clave, src, dest, traduccion)."""
+        ahora = time.time()
+        with self._lock, self._conexion:
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO traducciones (clave, src, dest, traduccion, creada) VALUES (?, ?, ?, ?, ?)",
+                [(*fila, ahora) for fila in filas]
+            )
+
+
+# --- Servicio ---
+
+class ServicioTraduccion:
+    """
+    Capa de traducción usada por la API, el modelo de consola y los procesos por lote:
+    - consulta primero el almacén persistente;
+    - agrupa los textos que faltan en pocas llamadas (unidos por salto de línea,
+      hasta max_caracteres por llamada) en lugar de una llamada por texto;
+    - reutiliza siempre el mismo cliente.
+    """
+
+    def __init__(self, cliente, ruta_cache=None, max_caracteres=4500):
+        self.cliente = cliente
+        self.cache = CacheTraducciones(ruta_cache) if ruta_cache else None
+        self.max_caracteres = max_caracteres
+        self.llamadas = 0
+
+    # Agrupar / separar lotes
+
+    def _grupos(self, textos):
+        grupo, largo = [], 0
+        for texto in textos:
+            if grupo and largo + len(texto) + 1 > self.max_caracteres:
+                yield grupo
+                grupo, largo = [], 0
+            grupo.append(texto)
+            largo += len(texto) + 1
+        if grupo:
+            yield grupo
+
+    @staticmethod
+    def _una_linea(texto):
+        return ' '.join(texto.split())
+
+    def _separar(self, grupo, traducido):
+        lineas = traducido.split('\n') if traducido else []
+        return lineas if len(lineas) == len(grupo) else None
+
+    def _traducir_grupo(self, grupo, src, dest):
+        self.llamadas += 1
+        lineas = self._separar(grupo, self.cliente.traducir('\n'.join(grupo), src, dest))
+        if lineas is None:
+            # El traductor no respetó los saltos de línea: de a uno
+            self.llamadas += len(grupo)
+            lineas = [self.cliente.traducir(texto, src, dest) for texto in grupo]
+        return lineas
+
+    async def _traducir_grupo_async(self, grupo, src, dest):
+        self.llamadas += 1
+        lineas = self._separar(grupo, await self.cliente.traducir_async('\n'.join(grupo), src, dest))
+        if lineas is None:
+            self.llamadas += len(grupo)
+            lineas = [await self.cliente.traducir_async(texto, src, dest) for texto in grupo]
+        return lineas
+
+    async def _traducir_grupo_sin_bloquear(self, grupo, src, dest):
+        if self.cliente.asincrono:
+            return await self._traducir_grupo_async(grupo, src, dest)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _ejecutor_traduccion, functools.partial(self._traducir_grupo, grupo, src, dest)
+        )
+
+    @staticmethod
+    def _ejecutar(corrutina):
+        """Corre una corrutina del cliente desde código síncrono, haya o no un event loop en el hilo."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(corrutina)
+        # Dentro de un event loop asyncio.run falla: se corre en un hilo de traducción
+        return _ejecutor_traduccion.submit(asyncio.run, corrutina).result()
+
+    # Caché
+
+    def _buscar(self, textos, src, dest):
+        """Devuelve (traducciones por texto ya conocidas, textos faltantes sin repetir)."""
+        unicos = list(dict.fromkeys(self._una_linea(t) for t in textos))
+        conocidas = {}
+        if self.cache is not None:
+            claves = {texto: CacheTraducciones.clave(texto, src, dest) for texto in unicos}
+            guardadas = self.cache.obtener(claves.values())
+            conocidas = {texto: guardadas[clave] for texto, clave in claves.items() if clave in guardadas}
+        return conocidas, [texto for texto in unicos if texto not in conocidas]
+
+    def _recordar(self, faltantes, traducciones, src, dest):
+        if self.cache is not None and faltantes:
+            self.cache.guardar([
+                (CacheTraducciones.clave(texto, src, dest), src, dest, traduccion)
+                for texto, traduccion in zip(faltantes, traducciones)
+            ])
+        return dict(zip(faltantes, traducciones))
+
+    # API pública
+
+    async def _traducir_grupos_async(self, grupos, src, dest):
+        return [linea for grupo in grupos for linea in await self._traducir_grupo_async(grupo, src, dest)]
+
+    def traducir_lote(self, textos, src='es', dest='en'):
+        conocidas, faltantes = self._buscar(textos, src, dest)
+        grupos = list(self._grupos(faltantes))
+        if not grupos:
+            traducciones = []
+        elif self.cliente.asincrono:
+            # Todos los grupos en un mismo event loop (y el mismo Translator de ese loop)
+            traducciones = self._ejecutar(self._traducir_grupos_async(grupos, src, dest))
+        else:
+            traducciones = [linea for grupo in grupos for linea in self._traducir_grupo(grupo, src, dest)]
+        conocidas.update(self._recordar(faltantes, traducciones, src, dest))
+        return [conocidas[self._una_linea(texto)] for texto in textos]
+
+    async def traducir_lote_async(self, textos, src='es', dest='en', timeout_grupo=None):
+        """
+        Con `timeout_grupo` cada llamada al traductor tiene su propio límite: los
+        textos de un grupo que falla o no termina a tiempo quedan en None y los
+        de los grupos que sí terminaron se devuelven y se guardan en la caché.
+        """
+        if not self.cliente.asincrono and timeout_grupo is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _ejecutor_traduccion, functools.partial(self.traducir_lote, textos, src, dest)
+            )
+        conocidas, faltantes = self._buscar(textos, src, dest)
+        traducidos, traducciones = [], []
+        for grupo in self._grupos(faltantes):
+            try:
+                lineas = await asyncio.wait_for(self._traducir_grupo_sin_bloquear(grupo, src, dest), timeout_grupo)
+            except Exception as e:
+                if timeout_grupo is None:
+                    raise
+                motivo = f"timeout de {timeout_grupo}s" if isinstance(e, asyncio.TimeoutError) else e
+                print(f"Error en traducción de {len(grupo)} texto(s): {motivo}, se usan los originales")
+                continue
+            traducidos.extend(grupo)
+            traducciones.extend(lineas)
+        conocidas.update(self._recordar(traducidos, traducciones, src, dest))
+        return [conocidas.get(self._una_linea(texto)) for texto in textos]
+
+    def traducir(self, texto, src='es', dest='en'):
+        return self.traducir_lote([texto], src, dest)[0]
+
+    async def traducir_async(self, texto, src='es', dest='en'):
+        return (await self.traducir_lote_async([texto], src, dest))[0]
+
+    def detectar(self, texto):
+        if self.cliente.asincrono:
+            return self._ejecutar(self.cliente.detectar_async(texto))
+        return self.cliente.detectar(texto)
+
+    async def detectar_async(self, texto):
+        if self.cliente.asincrono:
+            return await self.cliente.detectar_async(texto)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_ejecutor_traduccion, self.cliente.detectar, texto)
+
+    def metricas(self) -> dict:
+        return {
+            "llamadas_upstream": self.llamadas,
+            "cache_aciertos": self.cache.aciertos if self.cache is not None else 0,
+            "cache_fallos": self.cache.fallos if self.cache is not None else 0,
+        }
+
+
+# --- Detección + traducción de una reseña ---
+
+def idioma_local(texto: str):
+    """Idioma detectado sin red, o None si la confianza no alcanza."""
+    idioma, confianza = detectar_idioma(texto)
+    return idioma if confianza >= config.IDIOMA_CONFIANZA_MIN else None
+
+def _mostrar_traduccion(texto, traduccion):
+    print(f"Texto traducido: {texto} -> {traduccion}")
+    return traduccion, True
+
+def traducir_a_ingles(traductor: ServicioTraduccion, texto: str):
+    """
+    Detecta el idioma y traduce al inglés si la reseña está en español.
+    Devuelve (texto_para_analizar, traduccion_realizada).
+    Con IDIOMA_DETECCION_LOCAL el idioma se detecta en el proceso: el texto en
+    inglés (o dudoso) nunca se envía a Google.
+    """
+    if config.IDIOMA_DETECCION_LOCAL:
+        idioma = idioma_local(texto)
+    else:
+        idioma = traductor.detectar(texto)
+    if idioma == 'es':
+        return _mostrar_traduccion(texto, traductor.traducir(texto, src='es', dest='en'))
+    return texto, False
+
+async def _traducir_a_ingles_async(traductor: ServicioTraduccion, texto: str):
+    if config.IDIOMA_DETECCION_LOCAL:
+        idioma = idioma_local(texto)
+    else:
+        idioma = await traductor.detectar_async(texto)
+
+    if idioma != 'es':
+        return texto, False
+    return _mostrar_traduccion(texto, await traductor.traducir_async(texto, src='es', dest='en'))
+
+async def traducir_a_ingles_async(traductor: ServicioTraduccion, texto: str, timeout: float):
+    """
+    Igual que traducir_a_ingles pero sin bloquear el event loop y con timeout.
+    Si la traducción falla o tarda demasiado se usa el texto original.
+    """
+    try:
+        return await asyncio.wait_for(_traducir_a_ingles_async(traductor, texto), timeout)
+    except asyncio.TimeoutError:
+        print(f"Error en traducción: timeout de {timeout}s, se usa el texto original")
+    except Exception as trans_error:
+        print(f"Error en traducción: {trans_error}")
+    return texto, False
+
+async def traducir_lote_a_ingles_async(traductor: ServicioTraduccion, textos, timeout: float):
+    """
+    Versión por lote: detecta el idioma de cada texto localmente y traduce todos
+    los que están en español juntos. Devuelve (textos_para_analizar, traducidos).
+    `timeout` vale para cada llamada al traductor (un grupo de hasta
+    TRADUCCION_MAX_CARACTERES), no para el lote entero: un grupo lento sólo deja
+    sin traducir a sus textos.
+    """
+    indices_es = [i for i, texto in enumerate(textos) if idioma_local(texto) == 'es']
+    textos_analizar = list(textos)
+    traducidos = [False] * len(textos)
+    if not indices_es:
+        return textos_analizar, traducidos
+
+    try:
+        traducciones = await traductor.traducir_lote_async(
+            [textos[i] for i in indices_es], src='es', dest='en', timeout_grupo=timeout
+        )
+    except Exception as trans_error:
+        print(f"Error en traducción por lote: {trans_error}")
+        return textos_analizar, traducidos
+
+    for i, traduccion in zip(indices_es, traducciones):
+        if traduccion is not None:
+            textos_analizar[i] = traduccion
+            traducidos[i] = True
+    return textos_analizar, traducidos
@@ -0,0 +1,132 @@
+# app/verificar_planes.py
+# Verifica que las consultas calientes sobre Reviews usan los índices de la
+# migración 0002 y no recorren la tabla. Sin --url crea una base SQLite
+# temporal aplicando TODAS las migraciones (así también se prueban).
+#
+#   python -m app.verificar_planes                       # SQLite temporal
+#   python -m app.verificar_planes --url mysql+pymysql://...   # una base real
+#
+# Sale con código 1 si algún plan no usa el índice esperado.
+import argparse
+import os
+import re
+import sys
+import tempfile
+from sqlalchemy import create_engine, func, select, text
+from app import crud_async, models
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (descripción, consulta, índices aceptados para Reviews)
+CONSULTAS = [
+    (
+        "promedio por película (AVG)",
+        select(func.avg(models.Review.porcentaje_review)).where(models.Review.numPeliculareview == 1),
+        {"ix_reviews_pelicula_porcentaje"},
+    ),
+    (
+        "reviews por película, página por cursor",
+        select(models.Review)
+        .where(models.Review.numPeliculareview == 1, models.Review.idReview > 10)
+        .order_by(models.Review.idReview)
+        .limit(100),
+        {"ix_reviews_pelicula_review"},
+    ),
+    (
+        "reviews por usuario, página por cursor",
+        select(models.Review)
+        .where(models.Review.numPersonaReview == 1, models.Review.idReview > 10)
+        .order_by(models.Review.idReview)
+        .limit(100),
+        {"ix_reviews_usuario_review"},
+    ),
+    (
+        "películas con reviews (EXISTS)",
+        crud_async.consulta_peliculas_con_reviews()
+        .order_by(models.Pelicula.idPelicula)
+        .limit(100),
+        {"ix_reviews_pelicula_porcentaje", "ix_reviews_pelicula_review"},
+    ),
+]
+
+_PLAN_SQLITE = re.compile(r"^(SCAN|SEARCH) (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+))?")
+
+
+def aplicar_migraciones(url):
+    from alembic import command
+    from alembic.config import Config
+
+    configuracion = Config(os.path.join(RAIZ, "alembic.ini"))
+    configuracion.cmd_opts = argparse.Namespace(x=[f"url={url}"])
+    command.upgrade(configuracion, "head")
+
+
+def _cargar_datos(conexion):
+    """Algunas filas y estadísticas para que el planificador elija como en producción."""
+    conexion.execute(models.Usuario.__table__.insert(), [
+        {"nombreUsuario": "u", "apellidoUsuario": "u", "correoUsuario": f"u{i}@x.com"} for i in range(50)
+    ])
+    conexion.execute(models.Pelicula.__table__.insert(), [{"tituloPelicula": f"p{i}"} for i in range(50)])
+    conexion.execute(models.Review.__table__.insert(), [
+        {"numPersonaReview": 1 + i % 50, "numPeliculareview": 1 + i % 50, "textReview": "t", "porcentaje_review": i % 2}
+        for i in range(2000)
+    ])
+    conexion.execute(text("ANALYZE"))
+
+
+def accesos_reviews(conexion, consulta):
+    """Devuelve [(tipo_de_acceso, indice)] para la tabla Reviews en el plan de la consulta."""
+    sql = str(consulta.compile(conexion, compile_kwargs={"literal_binds": True}))
+    accesos = []
+    if conexion.dialect.name == "sqlite":
+        for fila in conexion.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+            coincidencia = _PLAN_SQLITE.match(fila[-1])
+            if coincidencia and coincidencia.group(2) == models.Review.__tablename__:
+                accesos.append((coincidencia.group(1), coincidencia.group(3)))
+    else:
+        # MySQL: type ALL/index = recorrido completo de la tabla o del índice
+        for fila in conexion.execute(text(f"EXPLAIN {sql}")).mappings():
+            if fila["table"] == models.Review.__tablename__:
+                tipo = "SCAN" if fila["type"] in ("ALL", "index") else "SEARCH"
+                accesos.append((tipo, fila["key"]))
+    return accesos
+
+
+def verificar(url):
+    motor = create_engine(url)
+    errores = 0
+    with motor.connect() as conexion:
+        for descripcion, consulta, esperados in CONSULTAS:
+            accesos = accesos_reviews(conexion, consulta)
+            correcto = bool(accesos) and all(tipo == "SEARCH" and indice in esperados for tipo, indice in accesos)
+            detalle = ", ".join(f"{tipo} {indice or '(sin índice)'}" for tipo, indice in accesos)
+            print(f"{'✅' if correcto else '❌'} {descripcion}: {detalle}")
+            errores += not correcto
+    motor.dispose()
+    return errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica los planes de las consultas sobre Reviews.")
+    parser.add_argument("--url", help="Base a verificar (por defecto, SQLite temporal con las migraciones)")
+    args = parser.parse_args()
+
+    if args.url:
+        errores = verificar(args.url)
+    else:
+        with tempfile.TemporaryDirectory() as directorio:
+            url = f"sqlite:///{os.path.join(directorio, 'planes.db')}"
+            aplicar_migraciones(url)
+            motor = create_engine(url)
+            with motor.begin() as conexion:
+                _cargar_datos(conexion)
+            motor.dispose()
+            errores = verificar(url)
+
+    if errores:
+        print(f"\n[ERROR] {errores} consulta(s) no usan el índice esperado.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# --- Microbenchmark del preprocesamiento ---
+# Compara, reseña por reseña sobre el corpus IMDB, la cadena de regex anterior
+# (varios re.sub + ~40 re.search sin compilar) contra el preprocesador de una
+# sola pasada de app/preprocesamiento.py. También verifica que ambos den
+# exactamente el mismo resultado.
+import argparse
+import re
+import sys
+import time
+import pandas as pd
+from entrenamiento import stop_words_modificadas
+from app.ai_service import cargar_stopwords
+from app.preprocesamiento import normalizar_para_entrenamiento, preprocesar
+
+# --- Implementación anterior (referencia) ---
+
+def _preprocesar_texto_mejorado_anterior(texto, stop_words):
+    texto = texto.lower().strip()
+    texto = re.sub(r"won't", "will_not", texto)
+    texto = re.sub(r"can't", "can_not", texto)
+    texto = re.sub(r"n't", "_not", texto)
+    texto = re.sub(r"\bnot\b", "_not_", texto)
+    texto = re.sub(r"\bno\b", "_no_", texto)
+    texto = re.sub(r"\bnever\b", "_never_", texto)
+    texto = re.sub(r'[^a-zA-Z\s!?_]', ' ', texto)
+    texto = re.sub(r'\s+', ' ', texto)
+    palabras = []
+    for palabra in texto.split():
+        if '_' in palabra or palabra not in stop_words:
+            palabras.append(palabra)
+    return ' '.join(palabras)
+
+_PATRONES_NEGATIVOS_ANTERIOR = [
+    r'_not', r'_no', r'_never', r'\bnot\b', r'\bno\b', r'\bnever\b',
+    r'\bhate\b', r'\bhated\b', r'\bhating\b', r'\bterrible\b',
+    r'\bawful\b', r'\bhorrible\b', r'\bboring\b', r'\bbored\b',
+    r'\bdislike\b', r'\bdisliked\b', r'\bworst\b', r'\bbad\b',
+    r'\bwaste\b', r'\brubbish\b', r'\bgarbage\b', r'\bstupid\b',
+    r'\bdumb\b', r'\bsucks\b', r'\bsucked\b'
+]
+
+_PATRONES_POSITIVOS_ANTERIOR = [
+    r'\blove\b', r'\bloved\b', r'\bloving\b', r'\bgreat\b',
+    r'\bamazing\b', r'\bawesome\b', r'\bfantastic\b', r'\bexcellent\b',
+    r'\bwonderful\b', r'\bbrilliant\b', r'\bperfect\b', r'\bbest\b',
+    r'\benjoyed\b', r'\benjoy\b', r'\bfun\b', r'\bfunny\b'
+]
+
+def _preprocesar_anterior(texto, stop_words):
+    texto_procesado = _preprocesar_texto_mejorado_anterior(texto, stop_words)
+    tiene_negacion = any(re.search(p, texto_procesado, re.IGNORECASE) for p in _PATRONES_NEGATIVOS_ANTERIOR)
+    tiene_positivo = any(re.search(p, texto_procesado, re.IGNORECASE) for p in _PATRONES_POSITIVOS_ANTERIOR)
+    return texto_procesado, tiene_negacion, tiene_positivo
+
+def _normalizar_anterior(texto, stop_words):
+    texto = texto.lower()
+    texto = re.sub(r'<br\s*/?>', ' ', texto)
+    texto = re.sub(r'[^a-zA-Z\s]', '', texto)
+    return ' '.join(palabra for palabra in texto.split() if palabra not in stop_words)
+
+# --- Medición ---
+
+def medir(funcion, textos, stop_words):
+    inicio = time.perf_counter()
+    resultados = [funcion(texto, stop_words) for texto in textos]
+    return resultados, (time.perf_counter() - inicio) / len(textos) * 1e6
+
+def comparar(nombre, anterior, nueva, textos, stop_words):
+    resultados_antes, us_antes = medir(anterior, textos, stop_words)
+    resultados_despues, us_despues = medir(nueva, textos, stop_words)
+
+    diferencias = sum(a != b for a, b in zip(resultados_antes, resultados_despues))
+    print(f"{nombre:<28} {us_antes:>9.1f} µs {us_despues:>9.1f} µs {us_antes / us_despues:>7.2f}x   {diferencias} diferencias")
+    return diferencias
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark del preprocesamiento por reseña.")
+    parser.add_argument('--dataset', default="IMDB Dataset.csv")
+    parser.add_argument('--n', type=int, default=10000, help="Cantidad de reseñas a medir")
+    args = parser.parse_args()
+
+    try:
+        df = pd.read_csv(args.dataset, encoding='latin-1', usecols=['review'], nrows=args.n)
+    except FileNotFoundError:
+        print(f"[ERROR] Archivo '{args.dataset}' no encontrado.", file=sys.stderr)
+        sys.exit(1)
+    textos = df['review'].dropna().astype(str).tolist()
+    stop_words_servicio = cargar_stopwords()
+
+    print(f"\n{len(textos)} reseñas de '{args.dataset}' (tiempo promedio por reseña)\n")
+    print(f"{'':<28} {'antes':>12} {'después':>12} {'mejora':>8}")
+    diferencias = comparar(
+        "API (preproceso + patrones)", _preprocesar_anterior, preprocesar, textos, stop_words_servicio
+    )
+    diferencias += comparar(
+        "Entrenamiento", _normalizar_anterior, normalizar_para_entrenamiento, textos, stop_words_modificadas
+    )
+
+    if diferencias:
+        print("\n[ERROR] El preprocesador de una pasada no coincide con la implementación anterior.")
+        sys.exit(1)
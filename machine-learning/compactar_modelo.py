@@ -0,0 +1,94 @@
+# --- Compactación del pipeline de sentimiento ---
+# Elimina los n-gramas cuyo coeficiente es prácticamente cero, pasa los pesos
+# a float32 y guarda un pipeline más chico. Reporta el cambio de accuracy sobre
+# el mismo conjunto de prueba que usa entrenar_y_evaluar.
+import argparse
+import copy
+import os
+import numpy as np
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import accuracy_score
+from sklearn.pipeline import Pipeline
+from entrenamiento import cargar_datos, dividir_datos, exportar_modelo_compacto
+
+
+def compactar_pipeline(pipeline, umbral=0.05):
+    """
+    Devuelve un Pipeline nuevo sin los features con |coef| <= umbral,
+    con IDF y coeficientes en float32.
+    """
+    tfidf = pipeline.named_steps['tfidf']
+    clf = pipeline.named_steps['clf']
+
+    coef = clf.coef_[0]
+    indices = np.flatnonzero(np.abs(coef) > umbral)
+
+    terminos = np.empty(len(tfidf.vocabulary_), dtype=object)
+    for termino, indice in tfidf.vocabulary_.items():
+        terminos[indice] = termino
+
+    # Vectorizador nuevo con vocabulario fijo: no arrastra stop_words_
+    # (todos los términos descartados por max_features, lo más pesado del .pkl)
+    tfidf_compacto = TfidfVectorizer(**{
+        **tfidf.get_params(),
+        'vocabulary': {termino: i for i, termino in enumerate(terminos[indices])},
+        'max_features': None,
+        'dtype': np.float32,
+    })
+    tfidf_compacto.idf_ = tfidf.idf_[indices].astype(np.float32)
+
+    clf_compacto = copy.deepcopy(clf)
+    clf_compacto.coef_ = coef[indices].astype(np.float32).reshape(1, -1)
+    clf_compacto.intercept_ = clf.intercept_.astype(np.float32)
+    clf_compacto.n_features_in_ = len(indices)
+
+    return Pipeline([('tfidf', tfidf_compacto), ('clf', clf_compacto)])
+
+
+def tamano_archivo(filepath):
+    return os.path.getsize(filepath) / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compacta sentimiento_pipeline.pkl.")
+    parser.add_argument('--entrada', default="sentimiento_pipeline.pkl")
+    parser.add_argument('--salida', default="sentimiento_pipeline_compacto.pkl")
+    parser.add_argument('--dataset', default="IMDB Dataset.csv")
+    parser.add_argument(
+        '--umbral', type=float, default=0.05,
+        help="Se eliminan los n-gramas con |coeficiente| <= umbral"
+    )
+    parser.add_argument(
+        '--exportar-compacto', action='store_true',
+        help="Además exporta el resultado al formato mapeable (sentimiento_compacto/)"
+    )
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.entrada)
+    compacto = compactar_pipeline(pipeline, umbral=args.umbral)
+
+    # Mismo conjunto de prueba que entrenar_y_evaluar
+    X_datos, y_labels = cargar_datos(args.dataset)
+    _, X_test, _, y_test = dividir_datos(X_datos, y_labels)
+
+    accuracy_original = accuracy_score(y_test, pipeline.predict(X_test))
+    accuracy_compacto = accuracy_score(y_test, compacto.predict(X_test))
+
+    joblib.dump(compacto, args.salida)
+
+    features_original = len(pipeline.named_steps['tfidf'].vocabulary_)
+    features_compacto = len(compacto.named_steps['tfidf'].vocabulary_)
+
+    print(f"\n----------- COMPACTACIÓN (umbral {args.umbral}) -----------")
+    print(f"Features:  {features_original} -> {features_compacto} "
+          f"({features_original - features_compacto} eliminados)")
+    print(f"Tamaño:    {tamano_archivo(args.entrada):.0f} KB -> {tamano_archivo(args.salida):.0f} KB")
+    print(f"Accuracy:  {accuracy_original:.4f} -> {accuracy_compacto:.4f} "
+          f"(Δ {accuracy_compacto - accuracy_original:+.4f})")
+    print("-------------------------------------------------")
+    print(f"[ÉXITO] Pipeline compacto guardado en '{args.salida}'")
+
+    if args.exportar_compacto:
+        # Se verifica contra el pipeline compactado antes de reemplazar sentimiento_compacto/
+        exportar_modelo_compacto(compacto, textos_verificacion=X_test)
@@ -1,6 +1,5 @@
 # --- Inicio: Contenido de entrenamiento.py ---
 import pandas as pd
-import re
 import nltk
 from nltk.corpus import stopwords
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -10,8 +9,17 @@ from sklearn.metrics import classification_report, accuracy_score
 from sklearn.pipeline import Pipeline # Importar Pipeline
 import joblib
 import sys
+import os
+import json
+import shutil
+import argparse
+import numpy as np
 import csv # Importar csv (aunque no lo usemos directamente, es buena práctica)
 
+# El preprocesamiento vive en app/ para que entrenamiento y API usen el mismo código
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.preprocesamiento import normalizar_para_entrenamiento, preprocesar, preprocesar_es
+
 # --- Configuración de NLTK (LÓGICA MEJORADA) ---
 try:
     stop_words_original = set(stopwords.words('english'))
@@ -36,22 +44,39 @@ print(f"[OK] Stopwords cargadas (se mantienen {len(negaciones)} palabras de nega
 
 def normalizar_texto(texto):
     """Limpia y normaliza el texto de las reseñas."""
+    # Eliminar HTML y no-alfabéticos, y usar la nueva lista de stopwords (una sola pasada)
+    return normalizar_para_entrenamiento(texto, stop_words_modificadas)
+
+def normalizar_texto_servicio(texto, stop_words):
+    """Mismo preprocesado que usa la API al predecir (negaciones unidas: "did_not")."""
     if not isinstance(texto, str):
         return ""
-    texto = texto.lower()
-    texto = re.sub(r'<br\s*/?>', ' ', texto) # Eliminar HTML
-    texto = re.sub(r'[^a-zA-Z\s]', '', texto) # Eliminar no-alfabéticos
-    
-    # Usa la nueva lista de stopwords
-    palabras = [palabra for palabra in texto.split() if palabra not in stop_words_modificadas] 
-    
-    return ' '.join(palabras)
+    return preprocesar(texto, stop_words)[0]
+
+def normalizar_texto_es(texto, stop_words):
+    """Preprocesado de la API para reseñas en español (el modelo se usa sin traducir)."""
+    if not isinstance(texto, str):
+        return ""
+    return preprocesar_es(texto, stop_words)[0]
+
+# Corpus por idioma: archivo, columna de texto y etiquetas aceptadas.
+# El español usa la versión traducida del IMDB de Kaggle ("IMDB Dataset SPANISH.csv").
+CORPUS = {
+    'en': {'archivo': "IMDB Dataset.csv", 'columna': 'review', 'etiqueta': 'sentiment'},
+    'es': {'archivo': "IMDB Dataset SPANISH.csv", 'columna': 'review_es', 'etiqueta': 'sentimiento'},
+}
+ETIQUETAS = {'positive': 1, 'negative': 0, 'positivo': 1, 'negativo': 0}
 
-def cargar_datos(filepath="IMDB Dataset.csv"):
+def cargar_datos(filepath=None, preprocesado="clasico", idioma="en"):
     """
     Carga y preprocesa el dataset (MODO ROBUSTO v3).
     La clave es usar la codificación correcta.
+    `preprocesado`: "clasico" (normalizar_texto) o "servicio" (el de la API).
+    `idioma`: "en" o "es"; en español siempre se usa el preprocesado de la API.
     """
+    corpus = CORPUS[idioma]
+    filepath = filepath or corpus['archivo']
+    columna, columna_etiqueta = corpus['columna'], corpus['etiqueta']
     print(f"Cargando el dataset de reseñas desde '{filepath}'...")
     
     try:
@@ -73,16 +98,17 @@ def cargar_datos(filepath="IMDB Dataset.csv"):
         sys.exit(1)
 
     # --- Verificación de columnas ---
-    if 'review' not in df.columns or 'sentiment' not in df.columns:
-        print(f"[ERROR] El CSV '{filepath}' no tiene las columnas 'review' y 'sentiment'.")
+    if columna not in df.columns or columna_etiqueta not in df.columns:
+        print(f"[ERROR] El CSV '{filepath}' no tiene las columnas '{columna}' y '{columna_etiqueta}'.")
         print(f"Columnas encontradas: {df.columns.tolist()}")
-        print("Asegúrate de que el CSV tenga los encabezados 'review' y 'sentiment'.")
+        print(f"Asegúrate de que el CSV tenga los encabezados '{columna}' y '{columna_etiqueta}'.")
         sys.exit(1)
+    df = df[[columna, columna_etiqueta]].set_axis(['review', 'sentiment'], axis=1)
         
     # --- Limpieza de datos ---
     df.dropna(subset=['review', 'sentiment'], inplace=True)
-    df['sentiment'] = df['sentiment'].astype(str).str.strip()
-    df = df[df['sentiment'].isin(['positive', 'negative'])]
+    df['sentiment'] = df['sentiment'].astype(str).str.strip().str.lower()
+    df = df[df['sentiment'].isin(ETIQUETAS)]
     
     print(f"Se encontraron {len(df)} filas válidas después de filtrar.")
 
@@ -93,21 +119,34 @@ def cargar_datos(filepath="IMDB Dataset.csv"):
         sys.exit(1)
 
     print("Normalizando texto... (esto puede tardar unos segundos)")
-    df['review_normalizada'] = df['review'].apply(normalizar_texto)
+    if idioma == "es":
+        from app.ai_service import cargar_stopwords
+        stop_words_es = cargar_stopwords("es")
+        df['review_normalizada'] = df['review'].apply(normalizar_texto_es, args=(stop_words_es,))
+    elif preprocesado == "servicio":
+        from app.ai_service import cargar_stopwords
+        stop_words_servicio = cargar_stopwords()
+        df['review_normalizada'] = df['review'].apply(normalizar_texto_servicio, args=(stop_words_servicio,))
+    else:
+        df['review_normalizada'] = df['review'].apply(normalizar_texto)
 
-    # Mapeo: 1 para 'positive', 0 para 'negative'
-    y = df['sentiment'].map({'positive': 1, 'negative': 0})
+    # Mapeo: 1 para 'positive'/'positivo', 0 para 'negative'/'negativo'
+    y = df['sentiment'].map(ETIQUETAS)
     X = df['review_normalizada']
 
     print("Carga y normalización completadas.")
     return X, y
 
+def dividir_datos(X, y):
+    """Split entrenamiento/prueba fijo (mismo random_state) para poder reevaluar después."""
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
 def entrenar_y_evaluar(X, y):
     """Crea, entrena y evalúa el pipeline."""
 
     # Dividir datos
     print("Dividiendo datos en conjuntos de entrenamiento y prueba...")
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_train, X_test, y_train, y_test = dividir_datos(X, y)
 
     # --- CREAR EL PIPELINE ---
     pipeline = Pipeline([
@@ -143,9 +182,132 @@ def guardar_pipeline(pipeline, filepath="sentimiento_pipeline.pkl"):
     joblib.dump(pipeline, filepath)
     print(f"\n[ÉXITO] Pipeline guardado exitosamente en '{filepath}'")
 
+def exportar_modelo_compacto(pipeline, directorio="sentimiento_compacto", idioma="en", textos_verificacion=None):
+    """
+    Exporta vocabulario, IDF y coeficientes a archivos .npy que la API abre con
+    mmap (app.ai_service.ModeloCompacto) en lugar de deserializar el Pipeline.
+    Los términos se guardan ordenados por sus bytes UTF-8 y los pesos alineados
+    a ese orden, así el vocabulario se consulta con búsqueda binaria.
+
+    Se escribe en un directorio hermano, se verifica contra el Pipeline y recién
+    entonces reemplaza a `directorio`: los workers que tienen mapeados los .npy
+    anteriores siguen leyendo esos archivos, nunca uno a medio escribir.
+    """
+    directorio = directorio.rstrip(os.sep)
+    temporal = f"{directorio}.nuevo"
+    shutil.rmtree(temporal, ignore_errors=True)
+    try:
+        _escribir_modelo_compacto(pipeline, temporal, idioma)
+        verificar_modelo_compacto(pipeline, temporal, textos_verificacion)
+    except Exception:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+    # Un directorio no vacío no se puede pisar con os.replace: el anterior se
+    # aparta, el nuevo toma su nombre y el anterior se borra (sus archivos
+    # siguen vivos para quien los tenga abiertos)
+    anterior = f"{directorio}.anterior"
+    if os.path.exists(directorio):
+        shutil.rmtree(anterior, ignore_errors=True)
+        os.replace(directorio, anterior)
+    os.replace(temporal, directorio)
+    shutil.rmtree(anterior, ignore_errors=True)
+
+    print(f"[ÉXITO] Modelo compacto exportado en '{directorio}/'")
+
+def _escribir_modelo_compacto(pipeline, directorio, idioma):
+    tfidf = pipeline.named_steps['tfidf']
+    clf = pipeline.named_steps['clf']
+
+    terminos = sorted(tfidf.vocabulary_, key=lambda t: t.encode('utf-8'))
+    orden = np.array([tfidf.vocabulary_[t] for t in terminos])
+
+    os.makedirs(directorio)
+    np.save(os.path.join(directorio, 'terminos.npy'), np.array([t.encode('utf-8') for t in terminos]))
+    np.save(os.path.join(directorio, 'idf.npy'), np.ascontiguousarray(tfidf.idf_[orden]))
+    np.save(os.path.join(directorio, 'coef.npy'), np.ascontiguousarray(clf.coef_[0][orden]))
+
+    meta = {
+        'formato': 1,
+        'idioma': idioma,
+        'intercepto': float(clf.intercept_[0]),
+        'clases': [int(c) for c in clf.classes_],
+        'ngram_range': list(tfidf.ngram_range),
+        'token_pattern': tfidf.token_pattern,
+        'lowercase': tfidf.lowercase,
+        'norm': tfidf.norm,
+        'sublinear_tf': tfidf.sublinear_tf,
+    }
+    with open(os.path.join(directorio, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    from app.ai_service import hash_modelo_compacto
+
+    # Versión por contenido: la API la usa para la caché de resultados y para detectar un modelo nuevo
+    meta['version'] = hash_modelo_compacto(directorio)
+    with open(os.path.join(directorio, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"Modelo compacto: {len(terminos)} términos escritos en '{directorio}/'")
+
+def verificar_modelo_compacto(pipeline, directorio="sentimiento_compacto", textos=None, tolerancia=None):
+    """
+    Comprueba que el scorer NumPy da las mismas probabilidades que el Pipeline.
+    Sin `tolerancia`, se toma según el tipo de los coeficientes: 1e-9 para
+    float64 y 1e-6 para float32 (pipeline pasado por compactar_modelo.py).
+    """
+    from app.ai_service import ModeloCompacto
+
+    if tolerancia is None:
+        coef = pipeline.named_steps['clf'].coef_
+        tolerancia = 1e-6 if coef.dtype == np.float32 else 1e-9
+
+    if textos is None:
+        # Sin dataset: frases armadas con términos del propio vocabulario
+        rng = np.random.default_rng(42)
+        vocabulario = list(pipeline.named_steps['tfidf'].vocabulary_)
+        textos = [' '.join(rng.choice(vocabulario, size=rng.integers(1, 40))) for _ in range(500)]
+        textos += ["", "movie", "not good at all", "great great great film"]
+
+    esperado = pipeline.predict_proba(list(textos))
+    obtenido = ModeloCompacto(directorio).predict_proba(list(textos))
+    diferencia = float(np.max(np.abs(esperado - obtenido)))
+
+    print(f"Diferencia máxima sklearn vs compacto: {diferencia:.2e} ({len(textos)} textos)")
+    if diferencia > tolerancia:
+        raise AssertionError(f"El modelo compacto difiere del pipeline en {diferencia:.2e} (> {tolerancia:.0e})")
+
 # --- Ejecución Principal ---
 if __name__ == "__main__":
-    X_datos, y_labels = cargar_datos()
-    modelo_pipeline = entrenar_y_evaluar(X_datos, y_labels)
-    guardar_pipeline(modelo_pipeline)
+    parser = argparse.ArgumentParser(description="Entrena y exporta el modelo de sentimiento.")
+    parser.add_argument(
+        '--solo-exportar', action='store_true',
+        help="No reentrena: exporta el formato compacto desde sentimiento_pipeline.pkl"
+    )
+    parser.add_argument(
+        '--preprocesado', choices=['clasico', 'servicio'], default='clasico',
+        help="'servicio' entrena con el mismo preprocesado que usa la API al predecir"
+    )
+    parser.add_argument(
+        '--idioma', choices=sorted(CORPUS), default='en',
+        help="Idioma del corpus. 'es' genera sentimiento_pipeline_es.pkl y sentimiento_compacto_es/"
+    )
+    parser.add_argument('--dataset', default=None, help="CSV del corpus (por defecto, el del idioma)")
+    args = parser.parse_args()
+
+    sufijo = '' if args.idioma == 'en' else f'_{args.idioma}'
+    ruta_pipeline = f"sentimiento_pipeline{sufijo}.pkl"
+    directorio_compacto = f"sentimiento_compacto{sufijo}"
+
+    if args.solo_exportar:
+        modelo_pipeline = joblib.load(ruta_pipeline)
+        exportar_modelo_compacto(modelo_pipeline, directorio_compacto, args.idioma)
+    else:
+        X_datos, y_labels = cargar_datos(args.dataset, preprocesado=args.preprocesado, idioma=args.idioma)
+        modelo_pipeline = entrenar_y_evaluar(X_datos, y_labels)
+        guardar_pipeline(modelo_pipeline, ruta_pipeline)
+        exportar_modelo_compacto(
+            modelo_pipeline, directorio_compacto, args.idioma,
+            textos_verificacion=X_datos.sample(n=min(2000, len(X_datos)), random_state=42)
+        )
 # --- Fin: Contenido de entrenamiento.py ---
\ No newline at end of file
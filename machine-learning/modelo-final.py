@@ -3,10 +3,19 @@ import joblib
 import re
 import nltk
 from nltk.corpus import stopwords
+import os
 import sys
 import logging
-from typing import Literal, Optional, Set
-from deep_translator import GoogleTranslator  # <-- 1. IMPORTAR LA LIBRERÍA
+from typing import List, Literal, Optional, Set
+
+# Raíz del repo en el path para usar app/ (este archivo también se ejecuta con exec desde run_model.py)
+_DIR = os.path.dirname(os.path.abspath(__file__))
+for _ruta in (_DIR, os.path.dirname(_DIR)):
+    if os.path.isdir(os.path.join(_ruta, 'app')) and _ruta not in sys.path:
+        sys.path.insert(0, _ruta)
+
+from app import config
+from app.services.traduccion import ClienteDeepTranslator, ServicioTraduccion, idioma_local
 
 # --- Configuración del Logging ---
 logging.basicConfig(
@@ -72,6 +81,8 @@ def _cargar_pipeline(filepath: str) -> Optional[object]:
 # --- Inicialización Global ---
 STOP_WORDS_MODIFICADAS = _cargar_stopwords()
 PIPELINE = _cargar_pipeline(PIPELINE_PATH)
+# Un solo cliente de traducción + caché persistente compartida con la API
+TRADUCTOR = ServicioTraduccion(ClienteDeepTranslator(timeout=5), ruta_cache=config.TRADUCCION_CACHE_RUTA)
 
 # --- Funciones Principales ---
 
@@ -93,13 +104,56 @@ def normalizar_texto(texto: str) -> str:
     
     return ' '.join(palabras) 
 
+def _traducir(textos: List[str], debug: bool = False) -> List[str]:
+    """
+    Traduce a inglés ('en'). Las reseñas ya traducidas salen de la caché y las
+    demás van juntas en pocas llamadas, agrupadas por el idioma detectado
+    localmente: con src='auto' el traductor detectaría un solo idioma para todo
+    el grupo. Las reseñas en inglés no se envían; las de idioma dudoso van de a
+    una con src='auto'. Si la traducción falla se usan los textos originales.
+    """
+    por_idioma = {}
+    for i, texto in enumerate(textos):
+        por_idioma.setdefault(idioma_local(texto), []).append(i)
+    try:
+        traducidos = list(textos)
+        for idioma, indices in por_idioma.items():
+            if idioma == 'en':
+                continue
+            if idioma is None:
+                parciales = [TRADUCTOR.traducir(textos[i], src='auto', dest='en') for i in indices]
+            else:
+                parciales = TRADUCTOR.traducir_lote([textos[i] for i in indices], src=idioma, dest='en')
+            for i, traducido in zip(indices, parciales):
+                traducidos[i] = traducido
+    except Exception as e:
+        # No mostrar el traceback completo en producción, solo el error.
+        # Es común que falle si el texto es muy corto o incomprensible.
+        log.warning(f"Error durante la traducción: {e}. Se usará el texto original.")
+        return list(textos)
+
+    resultado = []
+    for original, traducido in zip(textos, traducidos):
+        # A veces deep-translator devuelve None si falla o el texto es idéntico
+        if traducido:
+            if debug:
+                log.info(f"Debug: Texto Original = {original[:60]}...")
+                log.info(f"Debug: Texto Traducido (EN) = {traducido[:60]}...")
+            resultado.append(traducido)
+        else:
+            if debug:
+                log.info(f"Debug: Traducción devolvió None o es idéntico. Usando texto original.")
+            resultado.append(original)
+    return resultado
+
 def clasificar_sentimiento(
     texto_resena: str,
-    debug: bool = False
+    debug: bool = False,
+    traducir: bool = True
 ) -> Literal["Positivo", "Negativo", "Neutro", None]:
     """
     Traduce (si es necesario) y clasifica una reseña como
-    Positiva, Negativa o Neutra.
+    Positiva, Negativa o Neutra. Con traducir=False el texto ya está en inglés.
     """
     if PIPELINE is None:
         log.warning("El pipeline no está cargado. Saltando clasificación.")
@@ -109,29 +163,7 @@ def clasificar_sentimiento(
         return None # No clasificar texto vacío
 
     # --- 2. PASO DE TRADUCCIÓN ---
-    texto_para_normalizar = texto_resena
-    try:
-        # Traducir de 'auto' (detecta idioma) a inglés ('en')
-        # Poner un timeout corto para que la API no se cuelgue si el traductor falla
-        # NOTA: deep-translator maneja internamente la rotación de IPs/APIs de Google
-        texto_traducido = GoogleTranslator(source='auto', target='en').translate(text=texto_resena, timeout=5)
-        
-        # A veces deep-translator devuelve None si falla o el texto es idéntico
-        if texto_traducido:
-            texto_para_normalizar = texto_traducido
-            if debug:
-                log.info(f"Debug: Texto Original = {texto_resena[:60]}...")
-                log.info(f"Debug: Texto Traducido (EN) = {texto_traducido[:60]}...")
-        else:
-             if debug:
-                log.info(f"Debug: Traducción devolvió None o es idéntico. Usando texto original.")
-
-    except Exception as e:
-        # No mostrar el traceback completo en producción, solo el error.
-        # Es común que falle si el texto es muy corto o incomprensible.
-        log.warning(f"Error durante la traducción: {e}. Se usará el texto original.")
-        # Fallback: si la traducción falla, intenta clasificar el texto original
-        texto_para_normalizar = texto_resena
+    texto_para_normalizar = _traducir([texto_resena], debug)[0] if traducir else texto_resena
     # --- FIN DEL PASO DE TRADUCCIÓN ---
 
     # 3. Normalizar el texto (que ahora está en inglés)
@@ -161,6 +193,21 @@ def clasificar_sentimiento(
         log.error(f"Falla al predecir probabilidad: {e}", exc_info=True)
         return None
 
+def clasificar_sentimientos(
+    textos_resenas: List[str],
+    debug: bool = False
+) -> List[Literal["Positivo", "Negativo", "Neutro", None]]:
+    """
+    Igual que clasificar_sentimiento para muchas reseñas: todas se traducen
+    juntas (una llamada por bloque en lugar de una por reseña).
+    """
+    validos = [t for t in textos_resenas if isinstance(t, str) and t.strip()]
+    traducidos = dict(zip(validos, _traducir(validos, debug))) if validos else {}
+    return [
+        clasificar_sentimiento(traducidos[t], debug=debug, traducir=False) if t in traducidos else None
+        for t in textos_resenas
+    ]
+
 # --- Pruebas rápidas al ejecutar el archivo ---
 if __name__ == "__main__":
     if PIPELINE:
@@ -183,9 +230,9 @@ if __name__ == "__main__":
             "No la odié, pero tampoco me encantó. Simplemente pasable."
         ]
         
-        for resena in resenas_prueba:
-            # Pasamos debug=True para ver las probabilidades y la traducción
-            resultado = clasificar_sentimiento(resena, debug=True)
+        # Pasamos debug=True para ver las probabilidades y la traducción
+        resultados = clasificar_sentimientos(resenas_prueba, debug=True)
+        for resena, resultado in zip(resenas_prueba, resultados):
             print(f"'{resena[:60]}...' -> {resultado}\n")
 
     else:
@@ -1,32 +1,356 @@
-from fastapi import FastAPI, Depends, HTTPException, Form
-from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine
-from app import models, schemas, crud
+import asyncio
+import codecs
+import csv
+import hmac
+import time
+from fastapi import FastAPI, Depends, HTTPException, File, Form, Header, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import abrir_sesion, abrir_sesion_async, engine, metricas_pool, verificar_conexion
+from app.paginacion import decodificar_cursor, limitar, siguiente_cursor
+from app import models, schemas, crud_async as crud, config
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
-from app.ai_service import analizar_sentimiento, cargar_modelo, cargar_stopwords
+from app.ai_service import (
+    analizar_sentimiento, analizar_sentimientos_lote, cargar_modelos, cargar_stopwords, obtener_version_modelo,
+    versiones_en_disco, MAX_TEXTOS_LOTE, cache_sentimientos
+)
 from app.services.peliculas import obtener_info_pelicula
+from app.inferencia import BackendInferencia, MicroLoteador
+from app.ranking import CRITERIOS, RankingPeliculas
+from app.cache import CacheLRU
+from app.ingesta import ColaResenas
+from app import importacion
+from app.services.traduccion import (
+    ClienteGoogletrans, ServicioTraduccion, idioma_local, traducir_a_ingles, traducir_a_ingles_async,
+    traducir_lote_a_ingles_async
+)
 from googletrans import Translator
 
-# Inicializar el traductor (fuera del endpoint)
-translator = Translator()
+_importado = time.perf_counter()
+
+# Recursos pesados (traductor, modelos, esquema): se inicializan al importar o,
+# con INICIO_DIFERIDO, en segundo plano después de abrir el puerto (ver _inicializar)
+traductor = None
+
+def _iniciar_traductor():
+    """Un solo cliente (fuera del endpoint) y caché persistente."""
+    global traductor
+    traductor = ServicioTraduccion(
+        ClienteGoogletrans(Translator()),
+        ruta_cache=config.TRADUCCION_CACHE_RUTA,
+        max_caracteres=config.TRADUCCION_MAX_CARACTERES
+    )
+
+IDIOMAS_MODELO = ("en", "es") if config.MODELO_ES else ("en",)
+
+def _cargar_modelos_activos(stop_words_cargadas=None):
+    """
+    {idioma: (ruta, modelo, stop_words)}: el inglés y, si existe, el nativo en
+    español. `stop_words_cargadas` ({idioma: stop_words}) evita volver a
+    cargarlas al recargar los modelos.
+    """
+    stop_words_cargadas = stop_words_cargadas or {}
+    return {
+        idioma: (ruta, modelo, stop_words_cargadas.get(idioma) or cargar_stopwords(idioma))
+        for idioma, (ruta, modelo) in cargar_modelos(config.MODELO_FORMATO, IDIOMAS_MODELO).items()
+    }
 
-# cargar IA una vez
-modelo = cargar_modelo()
-stop_words = cargar_stopwords()
+# IA cargada una vez. Recargar (POST /admin/modelo/recargar) reemplaza el dict
+# entero: quien ya tomó un modelo termina con él
+modelos = {}
+
+def _modelo_idioma(idioma):
+    """(modelo, stop_words) con que se analiza una reseña en `idioma`."""
+    _, modelo, stop_words = modelos.get(idioma) or modelos["en"]
+    return modelo, stop_words
+
+def _crear_backend_inferencia(modelos_backend):
+    """Dónde corre el scoring: en el hilo actual, en un pool de hilos o en un pool de procesos."""
+    return BackendInferencia(
+        config.INFERENCIA_BACKEND,
+        trabajadores=config.INFERENCIA_PROCESOS if config.INFERENCIA_BACKEND == "procesos" else config.INFERENCIA_HILOS,
+        rutas_modelos={idioma: ruta for idioma, (ruta, _, _) in modelos_backend.items()}
+    )
+
+backend_inferencia = None
+
+# Micro-lotes: las reseñas concurrentes de /crear-resena/ comparten un predict_proba.
+# Uno por idioma: un lote sólo pasa por un modelo.
+# La lambda lee el modelo al despachar cada lote, no al crearse.
+microloteadores = {}
+
+def _iniciar_modelos():
+    """Modelos y stopwords, backend de inferencia y micro-loteadores."""
+    global modelos, backend_inferencia
+    modelos = _cargar_modelos_activos()
+    backend_inferencia = _crear_backend_inferencia(modelos)
+    if config.INFERENCIA_MICROLOTES:
+        for idioma in modelos:
+            microloteadores[idioma] = MicroLoteador(
+                lambda textos, idioma=idioma: backend_inferencia.analizar_lote(textos, *_modelo_idioma(idioma)),
+                espera_ms=config.INFERENCIA_LOTE_ESPERA_MS,
+                max_lote=config.INFERENCIA_LOTE_MAX
+            )
+
+def _crear_tablas():
+    # En producción: `alembic upgrade head` y DB_CREAR_TABLAS=false
+    if config.DB_CREAR_TABLAS:
+        models.Base.metadata.create_all(bind=engine)
+
+# Fases del arranque en orden, con su duración en segundos (GET /health/ready)
+FASES_INICIO = (("traductor", _iniciar_traductor), ("modelos", _iniciar_modelos), ("esquema", _crear_tablas))
+tiempos_inicio = {}
+estado_inicio = {"listo": False, "error": None}
+
+def _medir_fase(fase, funcion):
+    inicio = time.perf_counter()
+    funcion()
+    tiempos_inicio[fase] = round(time.perf_counter() - inicio, 3)
+    print(f"⏱️ Inicio '{fase}': {tiempos_inicio[fase]}s")
+
+if not config.INICIO_DIFERIDO:
+    for _fase, _funcion in FASES_INICIO:
+        _medir_fase(_fase, _funcion)
+
+# Ranking en memoria de /peliculas/ranking (se carga al arrancar)
+ranking = RankingPeliculas(config.RANKING_PESO_PREVIO)
+
+# Caché corta de /peliculas/detalle/{id}: clave (pelicula_id, limit, despues_de)
+cache_detalle = CacheLRU(config.DETALLE_CACHE_TAMANO, config.DETALLE_CACHE_TTL_S)
+
+def _review_creada(review):
+    """Estado en memoria que depende de las reviews de una película (después del commit)."""
+    ranking.registrar(review.numPeliculareview, review.resultado_review)
+    cache_detalle.invalidar_donde(lambda clave: clave[0] == review.numPeliculareview)
+
+# Trabajadores de la ingesta asíncrona (RESENA_ASINCRONA): analizan las
+# reseñas PENDIENTE en lotes con la misma ruta que /reviews/analizar-lote
+cola_resenas = ColaResenas(
+    lambda textos: _analizar_textos(textos, traducir=True),
+    al_completar=_review_creada,
+    trabajadores=config.INGESTA_TRABAJADORES,
+    lote_max=config.INGESTA_LOTE_MAX
+)
 
 app = FastAPI(title="MovieReviews", version="1.0.0")
 
-# Crear tablas
-models.Base.metadata.create_all(bind=engine)
+@app.on_event("shutdown")
+def cerrar_backend_inferencia():
+    if backend_inferencia is not None:
+        backend_inferencia.cerrar()
+
+async def _cargar_ranking():
+    db = abrir_sesion_async(lectura=True)
+    try:
+        ranking.cargar(await crud.get_estadisticas_ranking(db))
+    finally:
+        await db.close()
+
+async def _recargar_ranking_periodicamente():
+    while True:
+        await asyncio.sleep(config.RANKING_RECARGA_S)
+        try:
+            await _cargar_ranking()
+        except Exception as e:
+            print(f"⚠️ No se pudo recargar el ranking: {e}")
 
-# Dependency para obtener la sesión de BD
-def get_db():
-    db = SessionLocal()
+async def _iniciar_ranking():
+    try:
+        await _cargar_ranking()
+    except Exception as e:
+        # La API arranca igual; el ranking se completa con las reviews nuevas y la próxima recarga
+        print(f"⚠️ No se pudo cargar el ranking: {e}")
+    if config.RANKING_RECARGA_S > 0:
+        app.state.tarea_ranking = asyncio.create_task(_recargar_ranking_periodicamente())
+
+async def _iniciar_ingesta():
+    if config.RESENA_ASINCRONA:
+        await cola_resenas.iniciar()
+
+@app.on_event("shutdown")
+def detener_ingesta():
+    cola_resenas.detener()
+
+@app.on_event("shutdown")
+def detener_ranking():
+    tarea = getattr(app.state, "tarea_ranking", None)
+    if tarea:
+        tarea.cancel()
+
+# Recarga del modelo sin reiniciar: los modelos nuevos se cargan y se calientan
+# al costado y recién entonces reemplazan a `modelos` (y, con backend "procesos",
+# al pool) en una sola asignación. Lo que ya está en curso termina con el anterior.
+TEXTOS_CALENTAMIENTO = [
+    "This movie was wonderful, I loved every minute of it.",
+    "Terrible film, a complete waste of time.",
+    "La película me encantó, muy recomendable.",
+    "Aburrida y demasiado larga, no la recomiendo.",
+]
+_lock_recarga_modelo = asyncio.Lock()
+
+def _versiones_modelos(modelos_activos):
+    return {idioma: obtener_version_modelo(modelo) for idioma, (_, modelo, _) in modelos_activos.items()}
+
+def _calentar_modelos(modelos_nuevos):
+    """Corre en un hilo: un lote de prueba por modelo. Falla si alguno no lo puede analizar."""
+    for idioma, (ruta, modelo, stop_words) in modelos_nuevos.items():
+        resultados = analizar_sentimientos_lote(TEXTOS_CALENTAMIENTO, modelo, stop_words)
+        # Si predict_proba falla, analizar_sentimientos_lote responde con las reglas (sin versión)
+        if any(resultado["modelo_version"] is None for resultado in resultados):
+            raise RuntimeError(f"El modelo {ruta} no pudo analizar el lote de prueba")
+
+async def _calentar_backend(backend, modelos_nuevos):
+    """Con "procesos": un lote por worker, así cada proceso ya cargó los modelos nuevos."""
+    await asyncio.gather(*(
+        asyncio.wrap_future(backend.enviar_lote(TEXTOS_CALENTAMIENTO, modelo, stop_words))
+        for _, modelo, stop_words in modelos_nuevos.values()
+        for _ in range(backend.trabajadores)
+    ))
+
+async def _recargar_modelos(forzar: bool = False) -> dict:
+    """
+    Carga los modelos de disco si cambiaron (o con `forzar`), los calienta y
+    los pone en uso. Si algo falla se siguen usando los anteriores.
+    """
+    global modelos, backend_inferencia
+    async with _lock_recarga_modelo:
+        anteriores = _versiones_modelos(modelos)
+        if not forzar and versiones_en_disco(config.MODELO_FORMATO, IDIOMAS_MODELO) == anteriores:
+            return {"recargado": False, "versiones": anteriores, "segundos": 0.0}
+
+        inicio = time.perf_counter()
+        stop_words_cargadas = {idioma: stop_words for idioma, (_, _, stop_words) in modelos.items()}
+        nuevos = await run_in_threadpool(_cargar_modelos_activos, stop_words_cargadas)
+        await run_in_threadpool(_calentar_modelos, nuevos)
+
+        backend_anterior = None
+        if backend_inferencia.tipo == "procesos":
+            backend_nuevo = _crear_backend_inferencia(nuevos)
+            try:
+                await _calentar_backend(backend_nuevo, nuevos)
+            except Exception:
+                backend_nuevo.cerrar(esperar=False)
+                raise
+            backend_anterior, backend_inferencia = backend_inferencia, backend_nuevo
+
+        modelos = nuevos
+        if backend_anterior is not None:
+            # Sin esperar: los lotes ya enviados al pool anterior terminan igual
+            backend_anterior.cerrar(esperar=False)
+
+        versiones = _versiones_modelos(nuevos)
+        segundos = round(time.perf_counter() - inicio, 2)
+        print(f"🔄 Modelos recargados en {segundos}s: {versiones}")
+        return {"recargado": True, "versiones": versiones, "anteriores": anteriores, "segundos": segundos}
+
+async def _vigilar_modelo():
+    while True:
+        await asyncio.sleep(config.MODELO_RECARGA_S)
+        try:
+            await _recargar_modelos()
+        except Exception as e:
+            print(f"⚠️ No se pudo recargar el modelo (se sigue usando el anterior): {e}")
+
+def _iniciar_vigilancia_modelo():
+    if config.MODELO_RECARGA_S > 0:
+        app.state.tarea_modelo = asyncio.create_task(_vigilar_modelo())
+
+@app.on_event("shutdown")
+def detener_vigilancia_modelo():
+    tarea = getattr(app.state, "tarea_modelo", None)
+    if tarea:
+        tarea.cancel()
+
+async def _inicializar():
+    """
+    Fases del arranque que faltan (en hilos, sin frenar el event loop), la
+    conexión a la base y lo que depende de ellas. Al terminar, /health/ready
+    responde 200. Si algo falla: con INICIO_DIFERIDO /health/live responde 503;
+    sin él el error se propaga y el servidor no arranca, como antes.
+    """
+    fase = None
+    try:
+        for fase, funcion in FASES_INICIO:
+            if fase not in tiempos_inicio:
+                await run_in_threadpool(_medir_fase, fase, funcion)
+        fase = "pool_db"
+        inicio = time.perf_counter()
+        await verificar_conexion()
+        tiempos_inicio[fase] = round(time.perf_counter() - inicio, 3)
+        fase = "servicios"
+        await _iniciar_ranking()
+        await _iniciar_ingesta()
+        _iniciar_vigilancia_modelo()
+    except Exception as e:
+        estado_inicio["error"] = f"{fase}: {e}"
+        print(f"❌ Falló el arranque en '{fase}': {e}")
+        if not config.INICIO_DIFERIDO:
+            raise
+        return
+    tiempos_inicio["total"] = round(time.perf_counter() - _importado, 3)
+    estado_inicio["listo"] = True
+    print(f"✅ Servicio listo en {tiempos_inicio['total']}s")
+
+@app.on_event("startup")
+async def iniciar_servicios():
+    if config.INICIO_DIFERIDO:
+        # El puerto se abre ya: /health/live responde mientras carga lo pesado
+        app.state.tarea_inicio = asyncio.create_task(_inicializar())
+    else:
+        await _inicializar()
+
+@app.on_event("shutdown")
+def detener_inicio():
+    tarea = getattr(app.state, "tarea_inicio", None)
+    if tarea:
+        tarea.cancel()
+
+@app.middleware("http")
+async def esperar_inicio(request: Request, call_next):
+    """Con INICIO_DIFERIDO, 503 hasta que el servicio está listo (salvo /health/*)."""
+    if config.INICIO_DIFERIDO and not estado_inicio["listo"] and not request.url.path.startswith("/health/"):
+        return JSONResponse(
+            status_code=503, content={"detail": "El servicio se está iniciando"}, headers={"Retry-After": "1"}
+        )
+    return await call_next(request)
+
+@app.get("/health/live")
+def salud_vivo():
+    """El proceso responde; no espera al modelo ni a la base. 503 si el arranque falló."""
+    if estado_inicio["error"]:
+        return JSONResponse(status_code=503, content={"status": "error", "error": estado_inicio["error"]})
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+def salud_listo():
+    """200 cuando el modelo y el pool de la base están listos; incluye la duración de cada fase."""
+    contenido = {"listo": estado_inicio["listo"], "fases": tiempos_inicio, "error": estado_inicio["error"]}
+    return JSONResponse(status_code=200 if estado_inicio["listo"] else 503, content=contenido)
+
+# Dependency para obtener la sesión de BD (AsyncSession): los GET leen de la
+# réplica (si hay DB_HOST_LECTURA / DATABASE_URL_LECTURA), el resto va al primario
+async def get_db(request: Request):
+    db = abrir_sesion_async(lectura=request.method in ("GET", "HEAD"))
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+# Paginación por cursor: el cliente pasa `cursor` (el X-Next-Cursor de la
+# respuesta anterior) y la consulta sigue desde el último id, sin OFFSET
+def _leer_cursor(cursor: Optional[str]):
+    try:
+        return decodificar_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+def _pagina(response: Response, items, limit: int, campo_id: str):
+    siguiente = siguiente_cursor(items, limit, campo_id)
+    if siguiente:
+        response.headers["X-Next-Cursor"] = siguiente
+    return items
 
 @app.get("/")
 def read_root():
@@ -34,124 +358,290 @@ def read_root():
 
 # Endpoints para Usuarios
 @app.post("/usuarios/", response_model=schemas.Usuario)
-def crear_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)):
-    db_usuario = crud.get_usuario_by_email(db, email=usuario.correoUsuario)
+async def crear_usuario(usuario: schemas.UsuarioCreate, db: AsyncSession = Depends(get_db)):
+    db_usuario = await crud.get_usuario_by_email(db, email=usuario.correoUsuario)
     if db_usuario:
         raise HTTPException(status_code=400, detail="Email ya registrado")
-    return crud.create_usuario(db=db, usuario=usuario)
+    return await crud.create_usuario(db=db, usuario=usuario)
 
 @app.get("/usuarios/", response_model=list[schemas.Usuario])
-def leer_usuarios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    usuarios = crud.get_usuarios(db, skip=skip, limit=limit)
-    return usuarios
+async def leer_usuarios(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    limit = limitar(limit)
+    usuarios = await crud.get_usuarios(db, skip=skip, limit=limit, despues_de=_leer_cursor(cursor))
+    return _pagina(response, usuarios, limit, "idUsuario")
 
 @app.get("/usuarios/{usuario_id}", response_model=schemas.Usuario)
-def leer_usuario(usuario_id: int, db: Session = Depends(get_db)):
-    db_usuario = crud.get_usuario(db, usuario_id=usuario_id)
+async def leer_usuario(usuario_id: int, db: AsyncSession = Depends(get_db)):
+    db_usuario = await crud.get_usuario(db, usuario_id=usuario_id)
     if db_usuario is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return db_usuario
 
 # Endpoints para Películas
 @app.post("/peliculas/", response_model=schemas.Pelicula)
-def crear_pelicula(pelicula: schemas.PeliculaCreate, db: Session = Depends(get_db)):
-    db_pelicula = crud.get_pelicula_by_titulo(db, titulo=pelicula.tituloPelicula)
+async def crear_pelicula(pelicula: schemas.PeliculaCreate, db: AsyncSession = Depends(get_db)):
+    db_pelicula = await crud.get_pelicula_by_titulo(db, titulo=pelicula.tituloPelicula)
     if db_pelicula:
         raise HTTPException(status_code=400, detail="Película ya existe")
-    return crud.create_pelicula(db=db, pelicula=pelicula)
+    return await crud.create_pelicula(db=db, pelicula=pelicula)
 
 @app.get("/peliculas/", response_model=list[schemas.Pelicula])
-def leer_peliculas(
+async def leer_peliculas(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     titulo: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    peliculas = crud.get_peliculas(db, skip=skip, limit=limit, titulo=titulo) 
-    return peliculas
+    limit = limitar(limit)
+    peliculas = await crud.get_peliculas(db, skip=skip, limit=limit, titulo=titulo, despues_de=_leer_cursor(cursor))
+    return _pagina(response, peliculas, limit, "idPelicula")
 
 @app.get("/peliculas/reviews", response_model=list[schemas.Pelicula])
-def leer_peliculas_con_reviews(
+async def leer_peliculas_con_reviews(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    peliculas = db.query(models.Pelicula)\
-        .join(models.Review, models.Pelicula.idPelicula == models.Review.numPeliculareview)\
-        .group_by(models.Pelicula.idPelicula)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-    
-    return peliculas
+    limit = limitar(limit)
+    peliculas = await crud.get_peliculas_con_reviews(db, skip=skip, limit=limit, despues_de=_leer_cursor(cursor))
+    return _pagina(response, peliculas, limit, "idPelicula")
 
 @app.get("/peliculas/buscar/", response_model=list[schemas.Pelicula])
-def buscar_peliculas(
+async def buscar_peliculas(
+    response: Response,
     q: str,                      # <- query param obligatorio
-    db: Session = Depends(get_db)
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    limit = limitar(limit)
+    peliculas = await crud.buscar_peliculas(db, q, limit=limit, despues_de=_leer_cursor(cursor))
+    return _pagina(response, peliculas, limit, "idPelicula")
+
+@app.get("/peliculas/ranking", response_model=list[schemas.PeliculaRanking])
+async def leer_ranking_peliculas(
+    criterio: str = "puntaje",
+    limit: int = 10,
+    db: AsyncSession = Depends(get_db)
 ):
-    return crud.buscar_peliculas(db, q)
+    """
+    Películas mejor valoradas (`criterio=puntaje`: positividad bayesiana) o más
+    reseñadas (`criterio=reviews`), desde el ranking en memoria.
+    """
+    if criterio not in CRITERIOS:
+        raise HTTPException(status_code=400, detail=f"criterio debe ser uno de {', '.join(CRITERIOS)}")
+    top = ranking.top(criterio, max(1, min(limit, config.RANKING_TOP_MAX)))
+    peliculas = await crud.get_peliculas_por_ids(db, [pelicula_id for pelicula_id, *_ in top])
+    respuesta = []
+    for pelicula_id, puntaje, total, positivas in top:
+        pelicula = peliculas.get(pelicula_id)
+        if pelicula is None:
+            continue  # borrada después de cargar el ranking
+        respuesta.append({
+            "idPelicula": pelicula.idPelicula,
+            "tituloPelicula": pelicula.tituloPelicula,
+            "directorPelicula": pelicula.directorPelicula,
+            "añoPelicula": pelicula.añoPelicula,
+            "generos": pelicula.generos,
+            "poster_url": pelicula.poster_url,
+            "puntaje": puntaje,
+            "totalReviews": total,
+            "reviewsPositivas": positivas
+        })
+    return respuesta
 
 @app.get("/peliculas/{pelicula_id}", response_model=schemas.Pelicula)
-def leer_pelicula(pelicula_id: int, db: Session = Depends(get_db)):
-    db_pelicula = crud.get_pelicula(db, pelicula_id=pelicula_id)
+async def leer_pelicula(pelicula_id: int, db: AsyncSession = Depends(get_db)):
+    db_pelicula = await crud.get_pelicula(db, pelicula_id=pelicula_id)
     if db_pelicula is None:
         raise HTTPException(status_code=404, detail="Película no encontrada")
     return db_pelicula
 
 
-@app.get("/peliculas/detalle/{pelicula_id}")
-def leer_detalle_pelicula(pelicula_id: int, db: Session = Depends(get_db)):
-    pelicula = crud.get_pelicula(db, pelicula_id=pelicula_id)
-    if pelicula is None:
-        raise HTTPException(status_code=404, detail="Película no encontrada")
-
-    # Segunda consulta
-    resena = crud.get_reviews_by_pelicula(db, pelicula_id)
-
-    valoracion = crud.get_valoracion_by_pelicula(db, pelicula_id)
-    # Armás un JSON con lo que vos quieras
-    return {
-        "pelicula": pelicula,
-        "resena": resena,
-        "valoracion": valoracion
-    }
+@app.get("/peliculas/detalle/{pelicula_id}", response_model=schemas.DetallePelicula)
+async def leer_detalle_pelicula(
+    pelicula_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Película, página de reseñas y valoración: una consulta, o ninguna si está en caché."""
+    limit, despues_de = limitar(limit), _leer_cursor(cursor)
+    clave = (pelicula_id, limit, despues_de)
+    encontrado, detalle = cache_detalle.obtener(clave)
+    if not encontrado:
+        resultado = await crud.get_detalle_pelicula(db, pelicula_id, limit, despues_de)
+        if resultado is None:
+            raise HTTPException(status_code=404, detail="Película no encontrada")
+        pelicula, estadisticas, resena = resultado
+        # Objetos ya cargados (expire_on_commit=False): se leen sin volver a la base
+        detalle = {
+            "pelicula": pelicula,
+            "resena": resena,
+            "valoracion": estadisticas.valoracion if estadisticas else None,
+            "totalReviews": estadisticas.totalReviews if estadisticas else 0
+        }
+        cache_detalle.guardar(clave, detalle)
+    _pagina(response, detalle["resena"], limit, "idReview")
+    return detalle
 
 
 # Endpoints para Reviews
 @app.post("/reviews/", response_model=schemas.Review)
-def crear_review(review: schemas.ReviewCreate, db: Session = Depends(get_db)):
+async def crear_review(review: schemas.ReviewCreate, db: AsyncSession = Depends(get_db)):
     # Verificar que el usuario existe
-    usuario = crud.get_usuario(db, usuario_id=review.numPersonaReview)
+    usuario = await crud.get_usuario(db, usuario_id=review.numPersonaReview)
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
     # Verificar que la película existe
-    pelicula = crud.get_pelicula(db, pelicula_id=review.numPeliculareview)
+    pelicula = await crud.get_pelicula(db, pelicula_id=review.numPeliculareview)
     if not pelicula:
         raise HTTPException(status_code=404, detail="Película no encontrada")
     
-    return crud.create_review(db=db, review=review)
+    db_review = await crud.create_review(db=db, review=review)
+    _review_creada(db_review)
+    return db_review
+
+async def _analizar_textos(textos, traducir):
+    """
+    Un predict_proba por idioma para todos los textos. Con modelo en español las
+    reseñas en español van a él; si no, con `traducir` se traducen juntas.
+    """
+    traducidos = [False] * len(textos)
+    idiomas = ["en"] * len(textos)
+    if "es" in modelos:
+        idiomas = ["es" if idioma_local(texto) == "es" else "en" for texto in textos]
+    elif traducir:
+        textos, traducidos = await traducir_lote_a_ingles_async(traductor, textos, config.TRADUCCION_TIMEOUT_S)
+
+    resultados = [None] * len(textos)
+    for idioma in set(idiomas):
+        indices = [i for i, idioma_texto in enumerate(idiomas) if idioma_texto == idioma]
+        parciales = await backend_inferencia.analizar_lote([textos[i] for i in indices], *_modelo_idioma(idioma))
+        for i, resultado in zip(indices, parciales):
+            resultado["traduccion_realizada"] = traducidos[i]
+            resultado["modelo_idioma"] = idioma
+            resultados[i] = resultado
+    return resultados
+
+@app.post("/reviews/analizar-lote", response_model=schemas.ResultadoAnalisisLote)
+async def analizar_lote(lote: schemas.AnalisisLote):
+    """
+    Analiza muchas reseñas con una sola llamada al modelo (por idioma).
+    Si hay modelo en español, las reseñas en español se analizan con él; si no,
+    con `traducir` se traducen juntas antes de analizar.
+    """
+    if len(lote.textos) > MAX_TEXTOS_LOTE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo {MAX_TEXTOS_LOTE} textos por lote (recibidos {len(lote.textos)})"
+        )
+    resultados = await _analizar_textos(lote.textos, lote.traducir)
+    return {"total": len(resultados), "resultados": resultados}
+
+def _importar_archivo(archivo, formato, pelicula, tamano_lote):
+    """Corre en un hilo: sesión síncrona y modelo por lotes, sin frenar el event loop."""
+    db = abrir_sesion()
+    try:
+        # codecs y no io.TextIOWrapper: el SpooledTemporaryFile de Starlette no tiene readable() antes de Python 3.11
+        registros = importacion.leer_registros(codecs.getreader("utf-8")(archivo), formato)
+        modelos_importacion = {idioma: _modelo_idioma(idioma) for idioma in modelos}
+        return importacion.importar(db, registros, modelos_importacion, tamano_lote=tamano_lote, pelicula=pelicula)
+    finally:
+        db.close()
+
+@app.post("/importar")
+async def importar_resenas(
+    archivo: UploadFile = File(...),
+    pelicula: Optional[str] = Form(None),
+    tamano_lote: int = Form(config.IMPORTACION_LOTE)
+):
+    """
+    Importa reseñas desde un CSV o NDJSON (según la extensión) por lotes de
+    hasta IMPORTACION_LOTE_MAX. `pelicula` es el título para los registros sin
+    columna de título. Las reseñas no se traducen (ver importacion.analizar_por_idioma).
+    """
+    formato = importacion.formato_de(archivo.filename or "")
+    tamano_lote = max(1, min(tamano_lote, config.IMPORTACION_LOTE_MAX))
+    try:
+        resumen = await run_in_threadpool(_importar_archivo, archivo.file, formato, pelicula, tamano_lote)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Archivo inválido: {e}")
+    finally:
+        # Las reseñas no pasaron por create_review: se recargan ranking y caché
+        # (también si falló a mitad: los lotes anteriores ya están confirmados)
+        cache_detalle.limpiar()
+        await _cargar_ranking()
+    return resumen
 
 @app.get("/reviews/", response_model=list[schemas.Review])
-def leer_reviews(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    reviews = crud.get_reviews(db, skip=skip, limit=limit)
-    return reviews
+async def leer_reviews(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    limit = limitar(limit)
+    reviews = await crud.get_reviews(db, skip=skip, limit=limit, despues_de=_leer_cursor(cursor))
+    return _pagina(response, reviews, limit, "idReview")
 
 @app.get("/reviews/{review_id}", response_model=schemas.Review)
-def leer_review(review_id: int, db: Session = Depends(get_db)):
-    db_review = crud.get_review(db, review_id=review_id)
+async def leer_review(review_id: int, db: AsyncSession = Depends(get_db)):
+    db_review = await crud.get_review(db, review_id=review_id)
     if db_review is None:
         raise HTTPException(status_code=404, detail="Review no encontrada")
     return db_review
 
+@app.get("/reviews/{review_id}/estado", response_model=schemas.EstadoReview)
+async def leer_estado_review(review_id: int, db: AsyncSession = Depends(get_db)):
+    """Progreso de una reseña de la ingesta asíncrona (el id es el que devolvió el 202)."""
+    review = await crud.get_review(db, review_id=review_id)
+    if review is None:
+        raise HTTPException(status_code=404, detail="Review no encontrada")
+    return {
+        "idReview": review.idReview,
+        "estado": review.estado_review,
+        "resultado_review": review.resultado_review,
+        "porcentaje_review": review.porcentaje_review,
+        "en_cola": cola_resenas.metricas()["en_cola"]
+    }
+
 @app.get("/usuarios/{usuario_id}/reviews/", response_model=list[schemas.Review])
-def leer_reviews_usuario(usuario_id: int, db: Session = Depends(get_db)):
-    return crud.get_reviews_by_usuario(db, usuario_id=usuario_id)
+async def leer_reviews_usuario(
+    usuario_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    limit = limitar(limit)
+    reviews = await crud.get_reviews_by_usuario(db, usuario_id=usuario_id, limit=limit, despues_de=_leer_cursor(cursor))
+    return _pagina(response, reviews, limit, "idReview")
 
 @app.get("/peliculas/{pelicula_id}/reviews/", response_model=list[schemas.Review])
-def leer_reviews_pelicula(pelicula_id: int, db: Session = Depends(get_db)):
-    return crud.get_reviews_by_pelicula(db, pelicula_id=pelicula_id)
+async def leer_reviews_pelicula(
+    pelicula_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    limit = limitar(limit)
+    reviews = await crud.get_reviews_by_pelicula(db, pelicula_id=pelicula_id, limit=limit, despues_de=_leer_cursor(cursor))
+    return _pagina(response, reviews, limit, "idReview")
 
 # Agregar CORS para permitir requests desde Svelte
 app.add_middleware(
@@ -160,10 +650,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # el front lee el cursor de la página siguiente
 )
 
 
 
+# Helpers de /crear-resena/: con RESENA_NO_BLOQUEANTE el trabajo bloqueante
+# (traducción, modelo) sale del event loop; la BD ya es asíncrona
+async def _traducir(texto):
+    if config.RESENA_NO_BLOQUEANTE:
+        return await traducir_a_ingles_async(traductor, texto, config.TRADUCCION_TIMEOUT_S)
+    try:
+        return traducir_a_ingles(traductor, texto)
+    except Exception as trans_error:
+        print(f"Error en traducción: {trans_error}")
+        # Si falla la traducción, usar el texto original
+        return texto, False
+
+async def _analizar(texto, idioma="en"):
+    if idioma in microloteadores:
+        return await microloteadores[idioma].analizar(texto)
+    if config.RESENA_NO_BLOQUEANTE:
+        resultados = await backend_inferencia.analizar_lote([texto], *_modelo_idioma(idioma))
+        return resultados[0]
+    return analizar_sentimiento(texto, *_modelo_idioma(idioma))
+
+def _usuario_formulario(nombre: str, apellido: str):
+    """Usuario implícito del formulario, identificado por un correo temporal."""
+    return schemas.UsuarioCreate(
+        nombreUsuario=nombre,
+        apellidoUsuario=apellido,
+        correoUsuario=f"{nombre}.{apellido}@temp.com",
+        sexoUsuario="No especificado",
+        generoFavUsuario="No especificado"
+    )
+
 # Endpoint para crear reseña desde el formulario
 @app.post("/crear-resena/")
 async def crear_resena_completa(
@@ -171,64 +692,83 @@ async def crear_resena_completa(
     apellido: str = Form(...), 
     pelicula: str = Form(...),
     reseña: str = Form(...),
-    db: Session = Depends(get_db)
+    response: Response = None,
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        # 🔄 **NUEVO: Traducir la reseña si está en español**
-        reseña_traducida = reseña  # Por defecto usa el texto original
-        print(reseña_traducida)
-        # Detectar idioma y traducir si es español
-        try:
-            deteccion = translator.detect(reseña)
-            if deteccion.lang == 'es':
-                traduccion = translator.translate(reseña, src='es', dest='en')
-                reseña_traducida = traduccion.text
-                print(f"Texto traducido: {reseña} -> {reseña_traducida}")
-        except Exception as trans_error:
-            print(f"Error en traducción: {trans_error}")
-            # Si falla la traducción, usar el texto original
-        
-        # 1. Buscar o crear usuario
-        email_temp = f"{nombre}.{apellido}@temp.com"
-        usuario = crud.get_usuario_by_email(db, email_temp)
-
-        if not usuario:
-            usuario_data = schemas.UsuarioCreate(
-                nombreUsuario=nombre,
-                apellidoUsuario=apellido,
-                correoUsuario=email_temp,
-                sexoUsuario="No especificado",
-                generoFavUsuario="No especificado"
-            )
-            usuario = crud.create_usuario(db, usuario_data)
-
-        # 2. Buscar película por título
-        pelicula_db = crud.get_pelicula_by_titulo(db, pelicula)
+        # 1. Buscar película por título (antes de traducir/analizar y sin escribir nada)
+        pelicula_db = await crud.get_pelicula_by_titulo(db, pelicula)
         if not pelicula_db:
             raise HTTPException(status_code=404, detail="Película no encontrada")
+        # Datos para la respuesta, copiados ahora: si la transacción se reintenta,
+        # el rollback expira el objeto
+        pelicula_respuesta = {
+            "id": pelicula_db.idPelicula,
+            "titulo": pelicula_db.tituloPelicula,
+            "poster": pelicula_db.poster_url,
+            "anio": pelicula_db.añoPelicula,
+            "director": pelicula_db.directorPelicula,
+            "generos": pelicula_db.generos
+        }
+        # Se cierra la transacción de lectura: la conexión vuelve al pool mientras
+        # se traduce y analiza, y se toma otra para la escritura
+        await db.commit()
+
+        if config.RESENA_ASINCRONA:
+            # Ingesta asíncrona: se guarda sin analizar y un trabajador la completa
+            usuario, review = await crud.create_review_con_usuario(
+                db,
+                _usuario_formulario(nombre, apellido),
+                pelicula_id=pelicula_respuesta["id"],
+                texto=reseña,
+                pendiente=True
+            )
+            cola_resenas.encolar(review.idReview, reseña)
+            response.status_code = 202
+            return {
+                "mensaje": "Reseña recibida, se analizará en segundo plano",
+                "id_trabajo": review.idReview,
+                "estado": review.estado_review,
+                "estado_url": f"/reviews/{review.idReview}/estado",
+                "usuario": {
+                    "nombre": usuario.nombreUsuario,
+                    "apellido": usuario.apellidoUsuario
+                },
+                "pelicula": pelicula_respuesta
+            }
 
-        # 3. Analizar reseña con IA (usar la versión traducida)
-        analisis_ia = analizar_sentimiento(reseña_traducida, modelo, stop_words)
-
-        # 4. Crear reseña (guardar el texto original en español)
-        review_data = schemas.ReviewCreate(
-            textReview=reseña,  # Guardar texto original
-            numPersonaReview=usuario.idUsuario,
-            numPeliculareview=pelicula_db.idPelicula,
-            resultado_review=analisis_ia["resultado"],
-            porcentaje_review=analisis_ia["porcentaje"]
+        # 🔄 Reseña en español: con modelo nativo se analiza tal cual; si no, se
+        # traduce (si falla la traducción, se usa el texto original)
+        print(reseña)
+        idioma_analisis = "es" if "es" in modelos and idioma_local(reseña) == "es" else "en"
+        if idioma_analisis == "es":
+            reseña_traducida, traduccion_realizada = reseña, False
+        else:
+            reseña_traducida, traduccion_realizada = await _traducir(reseña)
+
+        # 2. Analizar reseña con IA (versión traducida o modelo en español)
+        analisis_ia = await _analizar(reseña_traducida, idioma_analisis)
+
+        # 3. Buscar o crear usuario y crear la reseña (texto original) en una
+        # sola transacción
+        usuario, review = await crud.create_review_con_usuario(
+            db,
+            _usuario_formulario(nombre, apellido),
+            pelicula_id=pelicula_respuesta["id"],
+            texto=reseña,
+            resultado=analisis_ia["resultado"],
+            porcentaje=analisis_ia["porcentaje"],
+            modelo_version=analisis_ia.get("modelo_version")
         )
-        review = crud.create_review(db, review_data)
-
-        # 5. Cargar película desde la BD
-        pelicula_info = crud.get_pelicula(db, pelicula_db.idPelicula)
+        _review_creada(review)
 
-        # 6. Respuesta final
+        # 4. Respuesta final (la película ya está en memoria)
         return {
             "mensaje": "Reseña creada y analizada exitosamente",
-            "traduccion_realizada": deteccion.lang == 'es' if 'deteccion' in locals() else False,
+            "traduccion_realizada": traduccion_realizada,
             "texto_original": reseña,
-            "texto_analizado": reseña_traducida if 'deteccion' in locals() and deteccion.lang == 'es' else reseña,
+            "texto_analizado": reseña_traducida,
+            "modelo_idioma": idioma_analisis,
 
             "usuario": {
                 "nombre": usuario.nombreUsuario,
@@ -242,27 +782,53 @@ async def crear_resena_completa(
                 "porcentaje": analisis_ia["porcentaje"]
             },
 
-            "pelicula": {
-                "id": pelicula_info.idPelicula,
-                "titulo": pelicula_info.tituloPelicula,
-                "poster": pelicula_info.poster_url,
-                "anio": pelicula_info.añoPelicula,
-                "director": pelicula_info.directorPelicula,
-                "generos": pelicula_info.generos
-            }
+            "pelicula": pelicula_respuesta
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+@app.get("/metricas/inferencia")
+def metricas_inferencia():
+    """Tamaños de lote del micro-loteador, profundidad de cola del backend, caché de resultados, traducción, ingesta asíncrona y versión de los modelos"""
+    return {
+        "microlotes": {idioma: m.metricas() for idioma, m in microloteadores.items()} or None,
+        "backend": backend_inferencia.metricas(),
+        "cache": cache_sentimientos.metricas(),
+        "traduccion": traductor.metricas(),
+        "ingesta": cola_resenas.metricas() if config.RESENA_ASINCRONA else None,
+        "modelos": _versiones_modelos(modelos)
+    }
+
+@app.post("/admin/modelo/recargar")
+async def recargar_modelo(forzar: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """
+    Carga el modelo de disco (si cambió, o siempre con `forzar`), lo calienta
+    con un lote de prueba y lo pone en uso sin reiniciar.
+    """
+    # Sin ADMIN_TOKEN configurado el endpoint queda cerrado
+    if not config.ADMIN_TOKEN or not hmac.compare_digest((x_admin_token or "").encode(), config.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Token de administración inválido")
+    try:
+        return await _recargar_modelos(forzar)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"No se pudo recargar el modelo (se sigue usando el anterior): {e}")
+
+@app.get("/metricas/db")
+def metricas_db():
+    """Estado de los pools (primario y réplica) y tiempos de espera por una conexión"""
+    return {nombre: metricas.metricas() for nombre, metricas in metricas_pool.items()}
+
 @app.get("/test-db")
-def test_database(db: Session = Depends(get_db)):
+async def test_database(db: AsyncSession = Depends(get_db)):
     """Endpoint para probar la conexión a la base de datos"""
     try:
         # Contar películas
-        peliculas_count = db.query(models.Pelicula).count()
-        usuarios_count = db.query(models.Usuario).count()
-        reviews_count = db.query(models.Review).count()
+        peliculas_count = await crud.contar(db, models.Pelicula)
+        usuarios_count = await crud.contar(db, models.Usuario)
+        reviews_count = await crud.contar(db, models.Review)
         
         return {
             "status": "Conexión exitosa",